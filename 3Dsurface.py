@@ -1,50 +1,35 @@
-import numpy as np
-import plotly.graph_objects as go
+from surface_model import load_surface
+from surface_render import build_figure
 
 
-# Load data from the text file
-data = np.loadtxt('dataset-KB30.txt')
+# Load the surface model once; its points are the raw data
+surface = load_surface('dataset-KB30.txt')
+data = surface.xyz
 
 # Assuming your data is organized as [x1, y1, z1; x2, y2, z2; ...]
 x, y, z = data[:, 0], data[:, 1], data[:, 2]
 
-# Create a 3D surface plot
-fig = go.Figure(data=go.Scatter3d(x=x, y=y, z=z, mode='markers',marker=dict(size=5,color=z,colorscale='Viridis',opacity=0.8)))
-
-# Customize the plot (add labels, title, etc.)
-fig.update_layout(
-    scene=dict(
-        xaxis_title='Q',
-        yaxis_title='RPM',
-        zaxis_title='dP',
-        xaxis_range=[-45, 110],  # Set x-axis range
-        yaxis_range=[80, 220],  # Set y-axis range
-        zaxis_range=[-35, 15],  # Set z-axis range
-        camera=dict(eye=dict(x=1.5, y=1.5, z=1.5)),
-    ),
-    title='Interactive 3D Surface Plot',
-)
+# Level of detail: points in the view are averaged onto this many (Q, RPM) bins
+DECIMATE_BINS = (150, 150)
+# Draw the interpolated surface mesh on its regular grid as well as the points
+SHOW_SURFACE = True
+
+# Create a 3D surface plot of the decimated points in the view ranges
+fig = build_figure(data, x_range=[-45, 110], y_range=[80, 220], z_range=[-35, 15],
+                   bins=DECIMATE_BINS, surface=surface if SHOW_SURFACE else None)
 
 # Show the interactive plot
 fig.show()
 
-def linear_interpolation(x0, y0, x1, y1, x2, y2, z1, z2):
-    # Calculate the interpolated z value
-    z0 = z1 + (z2 - z1) / (y2 - y1) * (y0 - y1)
-    return z0
-
 # Given (x0, y0) for interpolation
 x0, y0 = 31.5, 165
 
-# Find the indices of the nearest points (x1, y1) and (x2, y2)
-idx1 = min(range(len(x)), key=lambda i: abs(x[i] - x0))
-idx2 = max(0, idx1 - 1)
-
-# Perform linear interpolation
-z0 = linear_interpolation(x0, y0, x[idx1], y[idx1], x[idx2], y[idx2], z[idx1], z[idx2])
+# Locate the enclosing triangle and nearest points through the spatial index
+vertices, weights = surface.enclosing_triangles([x0], [y0])
+z0 = surface.linear_query([x0], [y0])[0]
 
-print(idx1,idx2)
+print(vertices[0], surface.nearest([x0], [y0], k=3)[0])
 
 print(f"Interpolated z0 at ({x0}, {y0}): {z0:.2f}")
 
-print(data)
\ No newline at end of file
+print(f"{len(data)} points loaded, Q {x.min():.2f} to {x.max():.2f}, RPM {y.min():.0f} to {y.max():.0f}")
\ No newline at end of file
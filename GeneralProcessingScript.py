@@ -1,9 +1,23 @@
 #!/usr/bin/python3
 
 import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import matplotlib.pyplot as plt
 
+# Parsed frames keyed by (path, mtime) so repeated loads skip unchanged files
+_frame_cache = {}
+
+# Number of Excel files from which parsing is spread over a process pool
+PARALLEL_EXCEL_THRESHOLD = 4
+
+# Persistent store used by the incremental mode: a JSON manifest plus one
+# Feather file (pickle when pyarrow is unavailable) per parsed input file
+CACHE_DIRECTORY = '.processing_cache'
+MANIFEST_FILE = 'manifest.json'
+
 def get_files_in_directory(directory, extensions):
     """Retrieve all files with specified extensions in the directory and subdirectories."""
     file_list = []
@@ -13,6 +27,177 @@ def get_files_in_directory(directory, extensions):
                 file_list.append(os.path.join(root, file))
     return file_list
 
+def read_data_file(file):
+    """Parse a single .csv, .xls or .xlsx file into a DataFrame."""
+    if file.endswith('.csv'):
+        return pd.read_csv(file)
+    return pd.read_excel(file)
+
+def load_frames(files, workers=None):
+    """Read each file once and return a list of (file, DataFrame) pairs.
+
+    Frames are cached by path and modification time, so only new or changed
+    files are parsed. With workers > 1 the uncached files are parsed in a
+    process pool, which pays off for many Excel files.
+    """
+    keys = {file: (file, os.path.getmtime(file)) for file in files}
+    pending = [file for file in files if keys[file] not in _frame_cache]
+
+    if workers and workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {file: executor.submit(read_data_file, file) for file in pending}
+        results = {}
+        for file, future in futures.items():
+            try:
+                results[file] = future.result()
+            except Exception as e:
+                print(f"Error reading file {file}: {e}")
+    else:
+        results = {}
+        for file in pending:
+            try:
+                results[file] = read_data_file(file)
+            except Exception as e:
+                print(f"Error reading file {file}: {e}")
+
+    for file, data in results.items():
+        _frame_cache[keys[file]] = data
+
+    return [(file, _frame_cache[keys[file]]) for file in files if keys[file] in _frame_cache]
+
+def file_hash(file, chunk_size=1 << 20):
+    """Return the SHA-1 hex digest of a file's content."""
+    digest = hashlib.sha1()
+    with open(file, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(cache_dir):
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable manifest '{manifest_path}': {e}")
+        return {}
+
+def save_manifest(cache_dir, manifest):
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+    temp_path = manifest_path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(temp_path, manifest_path)
+
+def store_cached_frame(cache_dir, file, data):
+    """Write a parsed frame to the cache and return the cache file name."""
+    stem = hashlib.sha1(os.path.abspath(file).encode()).hexdigest()
+    # Feather only stores string column names; frames with other labels are
+    # pickled so the labels come back with their original types
+    if all(isinstance(col, str) for col in data.columns):
+        try:
+            data.reset_index(drop=True).to_feather(os.path.join(cache_dir, stem + '.feather'))
+            return stem + '.feather'
+        except Exception:
+            pass
+    data.to_pickle(os.path.join(cache_dir, stem + '.pkl'))
+    return stem + '.pkl'
+
+def load_cached_frame(cache_dir, entry):
+    cache_path = os.path.join(cache_dir, entry['cache_file'])
+    if entry['cache_file'].endswith('.feather'):
+        return pd.read_feather(cache_path)
+    return pd.read_pickle(cache_path)
+
+def load_frames_incremental(files, cache_dir=CACHE_DIRECTORY, workers=None, root=None):
+    """Return (file, DataFrame) pairs, parsing only new or changed files.
+
+    The manifest records the size, mtime and content hash of every ingested
+    file. Unchanged files are served from the cache; files whose size or
+    mtime changed are re-hashed and only re-parsed when the content differs.
+    Entries for files that no longer exist are dropped; with root given,
+    only those under root, so one cache can serve several directories.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = load_manifest(cache_dir)
+
+    frames = {}
+    stale = []
+    for file in files:
+        key = os.path.abspath(file)
+        stat = os.stat(file)
+        entry = manifest.get(key)
+        if entry and (entry['size'], entry['mtime']) != (stat.st_size, stat.st_mtime):
+            content_hash = file_hash(file)
+            if content_hash == entry['hash']:
+                entry['size'], entry['mtime'] = stat.st_size, stat.st_mtime
+            else:
+                entry = None
+        if entry:
+            try:
+                frames[file] = load_cached_frame(cache_dir, entry)
+                continue
+            except Exception as e:
+                print(f"Cache entry for {file} is unusable, re-reading: {e}")
+        stale.append(file)
+
+    for file, data in load_frames(stale, workers=workers):
+        stat = os.stat(file)
+        key = os.path.abspath(file)
+        manifest[key] = {
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'hash': file_hash(file),
+            'cache_file': store_cached_frame(cache_dir, file, data),
+        }
+        frames[file] = data
+
+    # Forget files that have been removed from the scanned tree
+    prefix = os.path.join(os.path.abspath(root), '') if root else ''
+    for key in [key for key in manifest if key.startswith(prefix) and not os.path.exists(key)]:
+        cache_path = os.path.join(cache_dir, manifest.pop(key)['cache_file'])
+        if os.path.exists(cache_path):
+            os.remove(cache_path)
+
+    save_manifest(cache_dir, manifest)
+    print(f"Parsed {len(stale)} new or changed file(s), {len(files) - len(stale)} served from cache.")
+    return [(file, frames[file]) for file in files if file in frames]
+
+def combine_frames(frames):
+    """Concatenate the frames side by side, suffixing columns with the filename."""
+    renamed = []
+    for file, data in frames:
+        # Rename columns to include the filename without extension
+        filename = os.path.splitext(os.path.basename(file))[0]  # Remove file extension
+        renamed.append(data.set_axis([f"{col} - {filename}" for col in data.columns], axis=1))
+    # A single concat avoids re-copying the growing frame for every file
+    return pd.concat(renamed, axis=1)
+
+def plot_frames(frames):
+    """Plot every column against the first column of its file in one figure."""
+    plt.figure(figsize=(10, 6))
+    for file, data in frames:
+        # Extract filename without extension
+        filename = os.path.splitext(os.path.basename(file))[0]
+
+        # Plot each column (Y) against the first column (X)
+        x_column = data.columns[0]
+        y_columns = data.columns[1:]
+        for y_column in y_columns:
+            plt.plot(data[x_column], data[y_column], label=f"{y_column} vs {x_column} - {filename}")
+
+    # Set x and y labels based on the first two columns of the first file
+    first_data = frames[0][1]
+    plt.xlabel(first_data.columns[0])  # X-axis title
+    if len(first_data.columns) > 1:
+        plt.ylabel(first_data.columns[1])  # Y-axis title
+
+    plt.title("Combined Plot of All Curves")
+    plt.legend(loc="best", fontsize="small")
+    plt.grid()
+
 def main():
     # Ask user for subdirectory name
     subdirectory = input("Enter subdirectory name (default is current directory): ").strip()
@@ -30,27 +215,30 @@ def main():
     extensions = ('.csv', '.xls', '.xlsx')
     files = get_files_in_directory(subdirectory, extensions)
 
+    # Never ingest the combined output of a previous run
+    output_file = os.path.join(os.getcwd(), 'DataInProcessing.xlsx')
+    files = [file for file in files if os.path.abspath(file) != output_file]
+
     if not files:
         print("No files found with the specified extensions.")
         return
 
+    # Read every file exactly once; the frames feed both the export and the plot
+    excel_count = sum(1 for file in files if not file.endswith('.csv'))
+    workers = os.cpu_count() if excel_count >= PARALLEL_EXCEL_THRESHOLD else None
+    incremental = input("Use the incremental cache? [y/N]: ").strip().lower() == 'y'
+    if incremental:
+        frames = load_frames_incremental(files, os.path.join(os.getcwd(), CACHE_DIRECTORY), workers=workers,
+                                         root=subdirectory)
+    else:
+        frames = load_frames(files, workers=workers)
+
+    if not frames:
+        print("No files could be read.")
+        return
+
     # Combine all data into a single DataFrame by appending columns
-    combined_data = pd.DataFrame()
-    for file in files:
-        try:
-            if file.endswith('.csv'):
-                data = pd.read_csv(file)
-            else:
-                data = pd.read_excel(file)
-            
-            # Rename columns to include the filename without extension
-            filename = os.path.splitext(os.path.basename(file))[0]  # Remove file extension
-            data.columns = [f"{col} - {filename}" for col in data.columns]
-            
-            # Append columns to the combined DataFrame
-            combined_data = pd.concat([combined_data, data], axis=1)
-        except Exception as e:
-            print(f"Error reading file {file}: {e}")
+    combined_data = combine_frames(frames)
 
     # Provide a summary of the imported data
     print("\nSummary of Combined Data:")
@@ -59,7 +247,6 @@ def main():
     print(combined_data.head())
 
     # Write the combined data to an .xlsx file in the current directory
-    output_file = os.path.join(os.getcwd(), 'DataInProcessing.xlsx')
     try:
         combined_data.to_excel(output_file, index=False)
         print(f"\nCombined data has been written to '{output_file}'.")
@@ -68,34 +255,7 @@ def main():
 
     # Plot all curves in a single plot
     try:
-        plt.figure(figsize=(10, 6))
-        for file in files:
-            if file.endswith('.csv'):
-                data = pd.read_csv(file)
-            else:
-                data = pd.read_excel(file)
-            
-            # Extract filename without extension
-            filename = os.path.splitext(os.path.basename(file))[0]
-            
-            # Plot each column (Y) against the first column (X)
-            x_column = data.columns[0]
-            y_columns = data.columns[1:]
-            for y_column in y_columns:
-                plt.plot(data[x_column], data[y_column], label=f"{y_column} vs {x_column} - {filename}")
-        
-        # Set x and y labels based on the first two columns of the first file
-        first_file = files[0]
-        if first_file.endswith('.csv'):
-            first_data = pd.read_csv(first_file)
-        else:
-            first_data = pd.read_excel(first_file)
-        plt.xlabel(first_data.columns[0])  # X-axis title
-        plt.ylabel(first_data.columns[1])  # Y-axis title
-
-        plt.title("Combined Plot of All Curves")
-        plt.legend(loc="best", fontsize="small")
-        plt.grid()
+        plot_frames(frames)
         plt.show()
     except Exception as e:
         print(f"Error while plotting data: {e}")
@@ -0,0 +1,166 @@
+from collections import namedtuple
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+Roots = namedtuple('Roots', ['roots', 'multiplicity'])
+
+def derivative(func, z, h):
+    """Central-difference derivative of a holomorphic function with steps h."""
+    return (func(z + h) - func(z - h)) / (2 * h)
+
+def newton(func, seeds, fprime=None, tol=1e-12, max_iterations=200):
+    """Newton iteration from every seed at once.
+
+    func (and fprime, if given) must accept an array of the seeds' shape,
+    so any number of starting points, and of parameterised systems
+    broadcast against them, advance together. Seeds stop moving once
+    their step falls below tol relative to |z|. Without fprime the
+    derivative is a central difference whose step follows the Newton
+    step down, which keeps convergence to multiple roots linear instead
+    of stalling once the root is closer than the difference step.
+    Returns the final points and a mask of the seeds that converged.
+    """
+    z = np.array(seeds, dtype=complex)
+    active = np.ones(z.shape, dtype=bool)
+    scale = np.maximum(1.0, np.abs(z))
+    h = 1e-6 * scale
+    with np.errstate(all='ignore'):
+        for _ in range(max_iterations):
+            slope = fprime(z) if fprime is not None else derivative(func, z, h)
+            step = func(z) / slope
+            step = np.where(active & np.isfinite(step), step, 0)
+            z -= step
+            scale = np.maximum(1.0, np.abs(z))
+            active &= np.abs(step) > tol * scale
+            h = np.clip(np.abs(step), tol * scale, 1e-6 * scale)
+            if not active.any():
+                break
+    return z, ~active & np.isfinite(z)
+
+def winding_number(func, centers, radius, points=64):
+    """Zeros minus poles of func inside circles around each center (argument principle).
+
+    centers and radius broadcast together; func is evaluated once on an
+    array of shape centers.shape + (points,).
+    """
+    centers = np.asarray(centers, dtype=complex)
+    radius = np.asarray(radius, dtype=float)
+    angles = np.exp(2j * np.pi * np.arange(points) / points)
+    with np.errstate(all='ignore'):
+        values = func(centers[..., None] + radius[..., None] * angles)
+        turns = np.angle(np.roll(values, -1, axis=-1) / values).sum(axis=-1) / (2 * np.pi)
+    return np.rint(np.nan_to_num(turns)).astype(int)
+
+def cell_winding(func, x_range, y_range, cells=32, edge_points=8):
+    """Winding number of func around every cell of a cells x cells grid over the domain.
+
+    func is evaluated once on the lattice of cell edges and the phase
+    change along each lattice edge is shared by the two cells beside it.
+    Returns the cell centres and winding numbers, both of shape (cells, cells).
+    """
+    n = cells * edge_points + 1
+    x = np.linspace(x_range[0], x_range[1], n)
+    y = np.linspace(y_range[0], y_range[1], n)
+    real, imag = np.meshgrid(x, y, indexing='ij')
+    with np.errstate(all='ignore'):
+        values = func(real + 1j * imag)
+        # Phase change along each lattice step in x and in y
+        along_x = np.angle(values[1:, :] / values[:-1, :])
+        along_y = np.angle(values[:, 1:] / values[:, :-1])
+    rows = slice(None, None, edge_points)
+    bottom = along_x[:, rows].reshape(cells, edge_points, cells + 1).sum(axis=1)
+    side = along_y[rows, :].reshape(cells + 1, cells, edge_points).sum(axis=2)
+    # Counter-clockwise: bottom edge, right side, top edge reversed, left side reversed
+    turns = (bottom[:, :-1] + side[1:, :] - bottom[:, 1:] - side[:-1, :]) / (2 * np.pi)
+
+    centers = ((x[:-1:edge_points] + x[edge_points::edge_points]) / 2)[:, None] \
+        + 1j * ((y[:-1:edge_points] + y[edge_points::edge_points]) / 2)[None, :]
+    return centers, np.rint(np.nan_to_num(turns)).astype(int)
+
+def merge_roots(roots, radius):
+    """Cluster roots closer than radius and return one mean root per cluster."""
+    if len(roots) == 0:
+        return roots
+    points = np.column_stack([roots.real, roots.imag])
+    pairs = cKDTree(points).query_pairs(radius, output_type='ndarray')
+    graph = coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(len(roots), len(roots)))
+    count, labels = connected_components(graph, directed=False)
+    sums = np.bincount(labels, weights=roots.real, minlength=count) \
+        + 1j * np.bincount(labels, weights=roots.imag, minlength=count)
+    return sums / np.bincount(labels, minlength=count)
+
+def isolation_radius(roots, limit):
+    """Half the distance from each root to its nearest neighbour, capped at limit."""
+    if len(roots) < 2:
+        return np.full(len(roots), limit)
+    distance, _ = cKDTree(np.column_stack([roots.real, roots.imag])).query(
+        np.column_stack([roots.real, roots.imag]), k=2)
+    return np.minimum(0.5 * distance[:, 1], limit)
+
+def sorted_roots(roots, multiplicity, resolution):
+    """Roots ordered by real then imaginary part, ignoring real-part noise below resolution."""
+    order = np.lexsort((roots.imag, np.rint(roots.real / resolution)))
+    return Roots(roots[order], multiplicity[order])
+
+def in_domain(z, x_range, y_range):
+    return (z.real >= x_range[0]) & (z.real <= x_range[1]) & (z.imag >= y_range[0]) & (z.imag <= y_range[1])
+
+def find_roots(func, x_range, y_range, cells=32, seeds_per_axis=16, fprime=None, tol=1e-12,
+               residual=1e-8, merge_tol=1e-6):
+    """All roots of a vectorised complex function inside a rectangle, with multiplicities.
+
+    Newton is started in one batch from the centre of every grid cell the
+    argument principle says contains a zero, plus a regular grid of
+    seeds_per_axis x seeds_per_axis points in case a zero and a pole share
+    a cell. Converged points with |f| <= residual inside the domain are
+    merged when closer than merge_tol times the domain size, and the
+    multiplicity of each is the winding number of f on a small circle
+    around it. Returns Roots sorted by real then imaginary part.
+    """
+    span = max(x_range[1] - x_range[0], y_range[1] - y_range[0])
+    centers, winding = cell_winding(func, x_range, y_range, cells)
+    grid = np.add.outer(np.linspace(*x_range, seeds_per_axis), 1j * np.linspace(*y_range, seeds_per_axis))
+    seeds = np.concatenate([centers[winding > 0], grid.ravel()])
+
+    z, converged = newton(func, seeds, fprime, tol)
+    with np.errstate(all='ignore'):
+        keep = converged & in_domain(z, x_range, y_range) & (np.abs(func(z)) <= residual)
+    roots = merge_roots(z[keep], merge_tol * span)
+    multiplicity = winding_number(func, roots, isolation_radius(roots, 1e-3 * span))
+
+    return sorted_roots(roots, multiplicity, merge_tol * span)
+
+def sweep_roots(func, params, x_range, y_range, seeds_per_axis=8, fprime=None, tol=1e-12,
+                residual=1e-8, merge_tol=1e-6):
+    """Roots of a family of functions func(z, p), one system per parameter value.
+
+    Every system's seed grid is solved in a single batched Newton run over
+    an array of shape (len(params), seeds), and the multiplicities of all
+    roots found are checked in one more batched evaluation. params may be
+    any array whose elements func accepts broadcast against z. Returns one
+    Roots per parameter value.
+    """
+    params = np.asarray(params)
+    span = max(x_range[1] - x_range[0], y_range[1] - y_range[0])
+    grid = np.add.outer(np.linspace(*x_range, seeds_per_axis), 1j * np.linspace(*y_range, seeds_per_axis)).ravel()
+    p = params[:, None]
+    seeds = np.broadcast_to(grid, (len(params), len(grid)))
+
+    z, converged = newton(lambda z: func(z, p), seeds,
+                          None if fprime is None else (lambda z: fprime(z, p)), tol)
+    with np.errstate(all='ignore'):
+        keep = converged & in_domain(z, x_range, y_range) & (np.abs(func(z, p)) <= residual)
+
+    per_system = [merge_roots(z[k][keep[k]], merge_tol * span) for k in range(len(params))]
+    counts = [len(roots) for roots in per_system]
+    all_roots = np.concatenate(per_system)
+    radius = np.concatenate([isolation_radius(roots, 1e-3 * span) for roots in per_system])
+    owner = np.repeat(np.arange(len(params)), counts)
+    multiplicity = winding_number(lambda w: func(w, params[owner][:, None]), all_roots, radius)
+
+    results = []
+    for roots, mult in zip(per_system, np.split(multiplicity, np.cumsum(counts)[:-1])):
+        results.append(sorted_roots(roots, mult, merge_tol * span))
+    return results
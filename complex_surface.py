@@ -0,0 +1,130 @@
+import math
+from collections import OrderedDict
+import numpy as np
+
+class ComplexSurface:
+    """Adaptive, tile-cached evaluation of a complex function over views of the plane.
+
+    The plane is covered by square tiles on a global quadtree: a tile at
+    level L spans base_span / 2**L and holds tile_size x tile_size samples
+    at its cell centres. Tiles where the function varies strongly in
+    magnitude, takes non-finite values or winds around zero (a zero or pole
+    inside, by the argument principle) are split into four children, up to
+    max_depth levels below the view's base level, so samples concentrate
+    near zeros and poles while flat regions stay coarse. Evaluated tiles are
+    kept in an LRU cache keyed by (level, i, j), so panning and zooming only
+    evaluate tiles that have not been seen before.
+    """
+
+    def __init__(self, func, tile_size=64, base_span=16.0, max_depth=4, log_range=3.0, max_tiles=1024):
+        self.func = func
+        self.tile_size = tile_size
+        self.base_span = base_span
+        self.max_depth = max_depth
+        self.log_range = log_range
+        self.max_tiles = max_tiles
+        self.cache = OrderedDict()
+        self.evaluations = 0
+
+    def tile_span(self, level):
+        return self.base_span / 2**level
+
+    def tile_points(self, level, i, j):
+        span = self.tile_span(level)
+        offsets = (np.arange(self.tile_size) + 0.5) * span / self.tile_size
+        real, imag = np.meshgrid(i * span + offsets, j * span + offsets, indexing='ij')
+        return real, imag
+
+    def tile(self, level, i, j):
+        """Complex samples of one tile, evaluated on first use and cached."""
+        key = (level, i, j)
+        values = self.cache.get(key)
+        if values is not None:
+            self.cache.move_to_end(key)
+            return values
+        real, imag = self.tile_points(level, i, j)
+        with np.errstate(all='ignore'):
+            values = np.asarray(self.func(real + 1j * imag), dtype=complex)
+        self.evaluations += values.size
+        self.cache[key] = values
+        if len(self.cache) > self.max_tiles:
+            self.cache.popitem(last=False)
+        return values
+
+    def needs_refinement(self, values):
+        finite = np.isfinite(values)
+        if not finite.all():
+            return True
+        with np.errstate(divide='ignore'):
+            log_magnitude = np.log(np.abs(values))
+        if not np.isfinite(log_magnitude).all() or np.ptp(log_magnitude) > self.log_range:
+            return True
+        # Winding number of the values around the tile boundary
+        ring = np.concatenate([values[:, 0], values[-1, 1:], values[-2::-1, -1], values[0, -2:0:-1]])
+        winding = np.sum(np.angle(np.roll(ring, -1) / ring)) / (2 * np.pi)
+        return abs(winding) > 0.5
+
+    def view_level(self, x_range, y_range, resolution):
+        """Coarsest level whose sample spacing is no wider than a rendered cell."""
+        cell = max(x_range[1] - x_range[0], y_range[1] - y_range[0]) / resolution
+        return math.ceil(math.log2(self.base_span / (self.tile_size * cell)))
+
+    def leaves(self, x_range, y_range, level):
+        """(level, i, j, values) of the refined tiles covering the view, starting from `level`."""
+        span = self.tile_span(level)
+        stack = [(level, i, j)
+                 for i in range(math.floor(x_range[0] / span), math.ceil(x_range[1] / span))
+                 for j in range(math.floor(y_range[0] / span), math.ceil(y_range[1] / span))]
+        while stack:
+            tile_level, i, j = stack.pop()
+            values = self.tile(tile_level, i, j)
+            if tile_level < level + self.max_depth and self.needs_refinement(values):
+                stack.extend((tile_level + 1, 2 * i + di, 2 * j + dj) for di in (0, 1) for dj in (0, 1))
+            else:
+                yield tile_level, i, j, values
+
+    def samples(self, x_range, y_range, resolution=128):
+        """Sample points and values inside the view, from the refined tiles."""
+        level = self.view_level(x_range, y_range, resolution)
+        real, imag, values = [], [], []
+        for tile_level, i, j, tile_values in self.leaves(x_range, y_range, level):
+            tile_real, tile_imag = self.tile_points(tile_level, i, j)
+            inside = ((tile_real >= x_range[0]) & (tile_real <= x_range[1])
+                      & (tile_imag >= y_range[0]) & (tile_imag <= y_range[1]))
+            real.append(tile_real[inside])
+            imag.append(tile_imag[inside])
+            values.append(tile_values[inside])
+        return np.concatenate(real), np.concatenate(imag), np.concatenate(values)
+
+    def render_grid(self, x_range, y_range, resolution=128):
+        """Downsample the view to a resolution x resolution grid of |f| for plotting.
+
+        Each grid cell takes the most extreme of its samples in log
+        magnitude, the maximum or the minimum, whichever lies further from
+        the cell mean, so narrow zeros and poles survive the downsampling.
+        Returns the cell centre coordinates (as meshgrids) and |f|.
+        """
+        real, imag, values = self.samples(x_range, y_range, resolution)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_magnitude = np.log(np.abs(values))
+        log_magnitude[np.isnan(log_magnitude)] = np.inf  # Non-finite values sit at poles
+
+        i = np.clip(((real - x_range[0]) / (x_range[1] - x_range[0]) * resolution).astype(int), 0, resolution - 1)
+        j = np.clip(((imag - y_range[0]) / (y_range[1] - y_range[0]) * resolution).astype(int), 0, resolution - 1)
+        cell = j * resolution + i
+        order = np.argsort(cell, kind='stable')
+        cell, log_magnitude = cell[order], log_magnitude[order]
+        occupied, starts = np.unique(cell, return_index=True)
+
+        high = np.maximum.reduceat(log_magnitude, starts)
+        low = np.minimum.reduceat(log_magnitude, starts)
+        clipped = np.clip(log_magnitude, -50, 50)
+        mean = np.add.reduceat(clipped, starts) / np.diff(np.append(starts, len(cell)))
+        pooled = np.where(np.clip(high, -50, 50) - mean >= mean - np.clip(low, -50, 50), high, low)
+
+        grid = np.full(resolution * resolution, np.nan)
+        grid[occupied] = np.exp(pooled)
+        x = x_range[0] + (np.arange(resolution) + 0.5) * (x_range[1] - x_range[0]) / resolution
+        y = y_range[0] + (np.arange(resolution) + 0.5) * (y_range[1] - y_range[0]) / resolution
+        real_grid, imag_grid = np.meshgrid(x, y)
+        return real_grid, imag_grid, grid.reshape(resolution, resolution)
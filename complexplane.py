@@ -2,6 +2,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 from matplotlib.widgets import Button
+from complex_roots import find_roots
+from complex_surface import ComplexSurface
+
+VIEW_RESOLUTION = 128  # Rendered grid size; sampling refines further near zeros and poles
+Z_LIMIT = 30  # Clip |f1 - f2| near the pole at z=0
 
 def plot_complex_functions():
     def f1(z):
@@ -10,23 +15,32 @@ def plot_complex_functions():
     def f2(z):
         return 16 / z
 
-    real = np.linspace(-5, 5, 100)
-    imag = np.linspace(-5, 5, 100)
-    real, imag = np.meshgrid(real, imag)
-    z = real + 1j * imag
-
-    values_f1 = f1(z)
-    values_f2 = f2(z)
+    # Tiles evaluated for one view are cached and reused when panning and zooming
+    surface = ComplexSurface(lambda z: f1(z) - f2(z))
+    view = {'x': (-5.0, 5.0), 'y': (-5.0, 5.0)}
 
     global fig, ax
     fig = plt.figure(figsize=(12, 10))
     ax = fig.add_subplot(111, projection='3d')
 
-    # Plot the surface for |f1(z) - f2(z)|
-    surf = ax.plot_surface(real, imag, np.abs(values_f1 - values_f2), cmap='viridis', alpha=0.7)
+    artists = {}
+    def draw_surface():
+        for artist in artists.values():
+            artist.remove()
+        real, imag, magnitude = surface.render_grid(view['x'], view['y'], VIEW_RESOLUTION)
+        magnitude = np.minimum(magnitude, Z_LIMIT)
+
+        # Plot the surface for |f1(z) - f2(z)|
+        artists['surface'] = ax.plot_surface(real, imag, magnitude, cmap='viridis', alpha=0.7)
+
+        # Plot the intersection contour
+        artists['contour'] = ax.contour(real, imag, magnitude, levels=[0], colors='r', linewidths=2)
 
-    # Plot the intersection contour
-    ax.contour(real, imag, np.abs(values_f1 - values_f2), levels=[0], colors='r', linewidths=2)
+        ax.set_xlim(*view['x'])
+        ax.set_ylim(*view['y'])
+        return artists['surface']
+
+    surf = draw_surface()
 
     # Plot x+y=4 as a plane
     xx, yy = np.meshgrid(np.linspace(-5, 5, 10), np.linspace(-5, 5, 10))
@@ -38,7 +52,8 @@ def plot_complex_functions():
     y_line = 4 - x_line
     ax.plot(x_line, y_line, zs=0, color='blue', linewidth=2)
 
-    intersection_points = [2 + 2*np.sqrt(3)*1j, 2 - 2*np.sqrt(3)*1j]
+    # Solve f1(z) = f2(z) over the initial view
+    intersection_points = find_roots(lambda z: f1(z) - f2(z), view['x'], view['y']).roots
     for point in intersection_points:
         ax.scatter([point.real], [point.imag], [0], color='r', s=50)
 
@@ -48,10 +63,10 @@ def plot_complex_functions():
     ax.set_title('Intersection of x+y=4 and x*y=16 in the Complex Plane')
     
     # Add a color bar
-    fig.colorbar(surf, shrink=0.5, aspect=5)
+    colorbar = fig.colorbar(surf, shrink=0.5, aspect=5)
 
     # Add text instructions
-    fig.text(0.5, 0.02, 'Press x/y/z for views, Ctrl+x/y/z for flipped views', ha='center')
+    fig.text(0.5, 0.02, 'Press x/y/z for views, Ctrl+x/y/z for flipped views, arrows to pan, +/- to zoom', ha='center')
 
     # Set up key press event handler
     def on_key(event):
@@ -67,8 +82,26 @@ def plot_complex_functions():
             ax.view_init(elev=0, azim=180)
         elif event.key == 'ctrl+z':
             ax.view_init(elev=-90, azim=0)
+        elif event.key in ('left', 'right', 'up', 'down', '+', '-'):
+            pan_or_zoom(event.key)
         fig.canvas.draw()
 
+    def pan_or_zoom(key):
+        (x0, x1), (y0, y1) = view['x'], view['y']
+        dx, dy = x1 - x0, y1 - y0
+        if key in ('left', 'right'):
+            shift = 0.25 * dx * (1 if key == 'right' else -1)
+            view['x'] = (x0 + shift, x1 + shift)
+        elif key in ('up', 'down'):
+            shift = 0.25 * dy * (1 if key == 'up' else -1)
+            view['y'] = (y0 + shift, y1 + shift)
+        else:
+            scale = 0.5 if key == '+' else 2.0
+            cx, cy = 0.5 * (x0 + x1), 0.5 * (y0 + y1)
+            view['x'] = (cx - 0.5 * scale * dx, cx + 0.5 * scale * dx)
+            view['y'] = (cy - 0.5 * scale * dy, cy + 0.5 * scale * dy)
+        colorbar.update_normal(draw_surface())
+
     fig.canvas.mpl_connect('key_press_event', on_key)
 
     # Add button for switching between perspective and orthographic projections
@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+"""Headless batch fitting of flow-loss models to bench-test CSV files.
+
+Each CSV holds the flow rate in its first column and one pressure-drop
+dataset per remaining column. Every column is fitted with the selected
+model, with the same iterative z-score outlier removal as main.py, and the
+results are written to one table. Files are fitted in a process pool and
+nothing is plotted.
+
+Example:
+    python fitting_service.py results/*.csv -m power_law -o fits.csv
+"""
+
+import os
+import glob
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from main import SPECIFIC_GRAVITY, dp_function, batch_fit_cv, iterative_fit_and_remove_outliers
+
+# A flow-loss model dp = function(gpm, *params). batch, when set, fits a whole
+# (points, columns) array at once and returns (params, mask, iterations).
+FlowModel = namedtuple('FlowModel', ['function', 'param_names', 'p0', 'batch'])
+
+MODELS = {}
+
+def register_model(name, function, param_names, p0=None, batch=None):
+    """Add a model to the registry so it can be selected by name."""
+    MODELS[name] = FlowModel(function, tuple(param_names), p0, batch)
+
+def k_factor_function(gpm, K):
+    return K * SPECIFIC_GRAVITY * gpm**2
+
+def polynomial_function(gpm, c0, c1, c2):
+    return c0 + c1 * gpm + c2 * gpm**2
+
+def power_law_function(gpm, a, n):
+    return a * np.abs(gpm)**n
+
+def batch_fit_cv_params(gpm, dp, max_iterations, threshold):
+    Cv, mask, iterations = batch_fit_cv(gpm, dp, max_iterations, threshold)
+    return Cv[:, None], mask, iterations
+
+register_model('cv', dp_function, ['Cv'], batch=batch_fit_cv_params)
+register_model('k_factor', k_factor_function, ['K'], p0=[1.0])
+register_model('polynomial', polynomial_function, ['c0', 'c1', 'c2'], p0=[0.0, 0.0, 1.0])
+register_model('power_law', power_law_function, ['a', 'n'], p0=[1.0, 2.0])
+
+def fit_columns(gpm, dp, model_name='cv', max_iterations=5, threshold=2.5):
+    """Fit every column of dp with a registered model.
+
+    Returns a (columns, params) array, the (points, columns) mask of retained
+    points and the iteration count of each column. Columns whose fit fails
+    get NaN parameters and zero iterations.
+    """
+    model = MODELS[model_name]
+    gpm = np.asarray(gpm, dtype=float)
+    dp = np.asarray(dp, dtype=float)
+    if model.batch is not None:
+        return model.batch(gpm, dp, max_iterations, threshold)
+
+    params = np.full((dp.shape[1], len(model.param_names)), np.nan)
+    mask = np.zeros(dp.shape, dtype=bool)
+    iterations = np.zeros(dp.shape[1], dtype=int)
+    for column in range(dp.shape[1]):
+        valid = ~np.isnan(dp[:, column])
+        try:
+            popt, kept, count = iterative_fit_and_remove_outliers(
+                gpm[valid], dp[valid, column], max_iterations, threshold, model.function, model.p0)
+        except (RuntimeError, ValueError, TypeError) as e:
+            print(f"Fit failed for column {column}: {e}")
+            continue
+        params[column] = popt
+        mask[np.flatnonzero(valid)[kept], column] = True
+        iterations[column] = count
+    return params, mask, iterations
+
+def residual_stats(gpm, dp, params, mask, function):
+    """RMSE, maximum absolute residual and R^2 over the retained points."""
+    residuals = dp[mask] - function(gpm[mask], *params)
+    if residuals.size == 0:
+        return np.nan, np.nan, np.nan
+    total = np.sum((dp[mask] - np.mean(dp[mask]))**2)
+    r_squared = 1 - np.sum(residuals**2) / total if total > 0 else np.nan
+    return np.sqrt(np.mean(residuals**2)), np.max(np.abs(residuals)), r_squared
+
+def fit_file(path, model_name='cv', max_iterations=5, threshold=2.5):
+    """Fit every dataset column of one CSV file and return a list of result rows."""
+    data = pd.read_csv(path)
+    gpm = data.iloc[:, 0].to_numpy(dtype=float)
+    dp = data.iloc[:, 1:].to_numpy(dtype=float)
+    model = MODELS[model_name]
+    params, mask, iterations = fit_columns(gpm, dp, model_name, max_iterations, threshold)
+
+    rows = []
+    for column, name in enumerate(data.columns[1:]):
+        valid = ~np.isnan(dp[:, column])
+        outliers = np.flatnonzero(valid & ~mask[:, column])
+        rmse, max_residual, r_squared = residual_stats(
+            gpm, dp[:, column], params[column], mask[:, column], model.function)
+        row = {'file': path, 'dataset': name, 'model': model_name}
+        row.update(zip(model.param_names, params[column]))
+        row.update({
+            'iterations': iterations[column],
+            'points': int(valid.sum()),
+            'outliers': len(outliers),
+            'outlier_indices': ';'.join(str(index) for index in outliers),
+            'rmse': rmse,
+            'max_abs_residual': max_residual,
+            'r_squared': r_squared,
+        })
+        rows.append(row)
+    return rows
+
+def fit_files(paths, model_name='cv', max_iterations=5, threshold=2.5, workers=None):
+    """Fit many CSV files, one process pool task per file, and return a results table."""
+    rows = []
+    if workers == 1 or len(paths) < 2:
+        for path in paths:
+            try:
+                rows.extend(fit_file(path, model_name, max_iterations, threshold))
+            except Exception as e:
+                print(f"Error fitting file {path}: {e}")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(fit_file, path, model_name, max_iterations, threshold) for path in paths]
+            for path, future in zip(paths, futures):
+                try:
+                    rows.extend(future.result())
+                except Exception as e:
+                    print(f"Error fitting file {path}: {e}")
+    return pd.DataFrame(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit flow-loss models to every column of many CSV files.")
+    parser.add_argument('inputs', nargs='+', help="CSV files or glob patterns")
+    parser.add_argument('-m', '--model', default='cv', choices=sorted(MODELS), help="flow-loss model")
+    parser.add_argument('-o', '--output', default='fit_results.csv', help="results table (.csv or .xlsx)")
+    parser.add_argument('-t', '--threshold', type=float, default=2.0, help="outlier z-score threshold")
+    parser.add_argument('-n', '--max-iterations', type=int, default=5, help="maximum fit/reject iterations")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="number of worker processes")
+    args = parser.parse_args()
+
+    # Expand patterns here as well, since Windows shells pass them through
+    paths = []
+    for pattern in args.inputs:
+        paths.extend(sorted(glob.glob(pattern)) or [pattern])
+    paths = [path for path in paths if os.path.isfile(path)]
+    if not paths:
+        print("No input files found.")
+        return
+
+    results = fit_files(paths, args.model, args.max_iterations, args.threshold, args.workers)
+    if args.output.endswith('.xlsx'):
+        results.to_excel(args.output, index=False)
+    else:
+        results.to_csv(args.output, index=False)
+    print(f"Fitted {len(results)} datasets from {len(paths)} files, results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,82 +1,210 @@
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.optimize import curve_fit
+from scipy.stats import norm
+
+# Specific gravity factor of the dp = SG * (gpm / Cv)^2 valve equation
+SPECIFIC_GRAVITY = 0.9982
 
 def dp_function(gpm, Cv):
-    return (gpm / Cv)**2 * 0.9982
+    return (gpm / Cv)**2 * SPECIFIC_GRAVITY
+
+def detect_outliers(residuals, threshold=2.5, mask=None):
+    """Points whose residual z-score exceeds threshold, per column of residuals.
 
-def detect_outliers(gpm, dp, Cv, threshold=2.5):
-    dp_expected = dp_function(gpm, Cv)
-    residuals = dp - dp_expected
-    z_scores = np.abs((residuals - np.mean(residuals)) / np.std(residuals))
-    return z_scores > threshold
+    With a mask only the masked points enter the mean and standard
+    deviation, and only they can be flagged.
+    """
+    if mask is None:
+        mask = np.ones(residuals.shape, dtype=bool)
+    count = mask.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.sum(np.where(mask, residuals, 0.0), axis=0) / count
+        deviation = np.where(mask, residuals - mean, 0.0)
+        std = np.sqrt(np.sum(deviation**2, axis=0) / count)
+        return mask & (np.abs(deviation / std) > threshold)
 
-def iterative_fit_and_remove_outliers(gpm, dp, max_iterations=5, threshold=2.5):
+def iterative_fit_and_remove_outliers(gpm, dp, max_iterations=5, threshold=2.5, model=dp_function, p0=None):
+    """Fit one dataset with curve_fit, dropping z-score outliers between fits.
+
+    Used for arbitrary nonlinear models; dp_function datasets are normally
+    fitted in batch by batch_fit_cv. Returns the fitted parameter array, the
+    mask of retained points and the number of fits.
+    """
     mask = np.ones(len(gpm), dtype=bool)
     for iteration in range(max_iterations):
-        popt, _ = curve_fit(dp_function, gpm[mask], dp[mask])
-        Cv = popt[0]
-        new_outliers = detect_outliers(gpm[mask], dp[mask], Cv, threshold)
+        popt, _ = curve_fit(model, gpm[mask], dp[mask], p0=p0)
+        new_outliers = detect_outliers(dp[mask] - model(gpm[mask], *popt), threshold)
         if not np.any(new_outliers):
             break
         mask[mask] = ~new_outliers
-    return Cv, mask, iteration + 1
+    return popt, mask, iteration + 1
+
+def masked_cv_fit(gpm, dp, mask):
+    """Closed-form least-squares Cv for every column of dp at once.
+
+    dp = SG * gpm^2 * a with a = 1 / Cv^2 is linear in a, so the masked
+    least-squares solution is a = sum(x * dp) / sum(x^2) with x = SG * gpm^2.
+    gpm is a 1-D array shared by all columns, dp and mask are (points, columns).
+    """
+    x = (SPECIFIC_GRAVITY * gpm**2)[:, None]
+    xm = np.where(mask, x, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = np.sum(xm * np.where(mask, dp, 0.0), axis=0) / np.sum(xm * xm, axis=0)
+        return 1.0 / np.sqrt(a)
+
+def batch_fit_cv(gpm, dp, max_iterations=5, threshold=2.5):
+    """Fit Cv to every column of dp simultaneously with iterative outlier removal.
+
+    Mirrors iterative_fit_and_remove_outliers column by column, but every
+    fit, residual and z-score is computed as one array operation over all
+    columns. NaN samples are excluded from the start. Returns the Cv array,
+    the (points, columns) mask of retained points and the iteration counts.
+    """
+    dp = np.asarray(dp, dtype=float)
+    if dp.ndim == 1:
+        dp = dp[:, None]
+    gpm = np.asarray(gpm, dtype=float)
+
+    mask = ~np.isnan(dp)
+    dp_filled = np.where(mask, dp, 0.0)
+    active = np.ones(dp.shape[1], dtype=bool)
+    iterations = np.zeros(dp.shape[1], dtype=int)
+    Cv = np.full(dp.shape[1], np.nan)
+
+    for iteration in range(max_iterations):
+        Cv_new = masked_cv_fit(gpm, dp_filled, mask)
+        Cv[active] = Cv_new[active]
+        iterations[active] = iteration + 1
+
+        # z-scores of the residuals of the retained points, per column
+        residuals = dp_filled - dp_function(gpm[:, None], Cv[None, :])
+        outliers = detect_outliers(residuals, threshold, mask) & active
+
+        # Columns without new outliers have converged and keep their fit
+        active &= outliers.any(axis=0)
+        if not active.any():
+            break
+        mask &= ~outliers
+
+    return Cv, mask, iterations
+
+def bootstrap_chunk(x, y, size, seed):
+    """Closed-form 1/Cv^2 estimates for `size` bootstrap resamples of (x, y)."""
+    rng = np.random.default_rng(seed)
+    n = len(x)
+    # Each row holds how often every point is drawn in one resample
+    counts = rng.multinomial(n, np.full(n, 1.0 / n), size=size)
+    return (counts @ (x * y)) / (counts @ (x * x))
 
-# Read data from the CSV file
-data = pd.read_csv('dataset.csv')  # Replace with your actual file name
+def cv_confidence_interval(gpm, dp, mask=None, method='bootstrap', n_resamples=2000,
+                           confidence=0.95, seed=None, workers=None, chunk_size=50000):
+    """Confidence interval of Cv from resampling the retained points of one dataset.
 
-gpm_data = data.iloc[:, 0].values
-num_datasets = data.shape[1] - 1
+    All resamples are solved at once with the closed-form fit: a resample is a
+    row of draw counts, so its 1/Cv^2 estimate is a ratio of two matrix-vector
+    products. method='jackknife' uses the n leave-one-out fits instead. With
+    workers > 1 the bootstrap resamples are split into chunks over a process
+    pool, each chunk seeded independently from seed.
+    Returns (lower, upper, standard error).
+    """
+    gpm = np.asarray(gpm, dtype=float)
+    dp = np.asarray(dp, dtype=float)
+    if mask is None:
+        mask = ~np.isnan(dp)
+    x = SPECIFIC_GRAVITY * gpm[mask]**2
+    y = dp[mask]
+    alpha = (1 - confidence) / 2
 
-colors = ['red', 'blue', 'green', 'orange', 'purple', 'brown', 'pink', 'gray', 'olive', 'cyan']
+    if method == 'jackknife':
+        n = len(x)
+        a = (np.sum(x * y) - x * y) / (np.sum(x * x) - x * x)
+        Cv = 1.0 / np.sqrt(a)
+        Cv_full = 1.0 / np.sqrt(np.sum(x * y) / np.sum(x * x))
+        std = np.sqrt((n - 1) / n * np.sum((Cv - Cv.mean())**2))
+        z = norm.ppf(1 - alpha)
+        return Cv_full - z * std, Cv_full + z * std, std
 
-plt.figure(figsize=(12, 8))
+    sizes = [min(chunk_size, n_resamples - start) for start in range(0, n_resamples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers and workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(bootstrap_chunk, [x] * len(sizes), [y] * len(sizes), sizes, seeds))
+    else:
+        chunks = [bootstrap_chunk(x, y, size, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
 
-threshold = 2.0;  # Set the threshold for outlier detection
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Cv = 1.0 / np.sqrt(np.concatenate(chunks))
+    Cv = Cv[np.isfinite(Cv)]
+    lower, upper = np.quantile(Cv, [alpha, 1 - alpha])
+    return lower, upper, np.std(Cv, ddof=1)
+
+def main():
+    # Read data from the CSV file
+    data = pd.read_csv('dataset.csv')  # Replace with your actual file name
+
+    gpm_data = data.iloc[:, 0].values
+    num_datasets = data.shape[1] - 1
+
+    colors = ['red', 'blue', 'green', 'orange', 'purple', 'brown', 'pink', 'gray', 'olive', 'cyan']
+
+    plt.figure(figsize=(12, 8))
+
+    threshold = 2.0  # Set the threshold for outlier detection
+    n_resamples = 5000  # Bootstrap resamples for the Cv confidence interval
+    confidence = 0.95
+
+    # Fit all datasets in one batch
+    Cv_all, masks, iterations_all = batch_fit_cv(gpm_data, data.iloc[:, 1:].values, max_iterations=5, threshold=threshold)
 
-for i in range(num_datasets):
-    column_name = data.columns[i+1]
-    dp_data = data.iloc[:, i+1].values
-    
-    # Perform iterative fitting and outlier removal
-    Cv_best, mask, iterations = iterative_fit_and_remove_outliers(gpm_data, dp_data, max_iterations=5, threshold=threshold)
-    
     gpm_fit = np.linspace(min(gpm_data), max(gpm_data), 100)
-    dp_fit = dp_function(gpm_fit, Cv_best)
-    
-    # Plot data points, marking outliers differently
-    plt.scatter(gpm_data[mask], dp_data[mask], color=colors[i % len(colors)], label=f'{column_name} (Data)')
-    plt.scatter(gpm_data[~mask], dp_data[~mask], color=colors[i % len(colors)], marker='x', s=100, label=f'{column_name} (Outliers)')
-    plt.plot(gpm_fit, dp_fit, color=colors[i % len(colors)], linestyle='--', label=f'{column_name} (Fit)')
-    
-    # Display information on the plot
-    plt.text(0.05, 0.95 - 0.12 * i,  # Adjusted spacing factor to give more room between text blocks
-        f'{column_name}:\n'
-        f'Cv = {Cv_best:.4f}\n'
-        f'Iterations = {iterations}\n'
-        f'Threshold = {threshold} std dev\n\n\n\n',  # Added extra empty lines for spacing
-        transform=plt.gca().transAxes,
-        verticalalignment='top', 
-        color=colors[i % len(colors)],
-        bbox=dict(facecolor='white', alpha=0.7, edgecolor='none'), 
-        fontsize=12
-    )
-
-    
-    print(f"Results for {column_name}:")
-    print(f"  Best-fit Cv: {Cv_best:.4f}")
-    print(f"  Iterations: {iterations}")
-    print(f"  Outliers detected: {np.sum(~mask)}")
-    if np.any(~mask):
-        print(f"  Outlier GPM values: {gpm_data[~mask]}")
-    print()
-
-plt.xlabel('Flow Rate, gpm')
-plt.ylabel('Pressure Drop, psi')
-plt.title(f'Flow Rate vs Pressure Drop - Iterative Curve Fitting for {num_datasets} Datasets')
-plt.legend()
-plt.grid(True)
-
-plt.tight_layout()
-plt.show()
+
+    for i in range(num_datasets):
+        column_name = data.columns[i+1]
+        dp_data = data.iloc[:, i+1].values
+        Cv_best, mask, iterations = Cv_all[i], masks[:, i], iterations_all[i]
+
+        dp_fit = dp_function(gpm_fit, Cv_best)
+
+        # Plot data points, marking outliers differently
+        plt.scatter(gpm_data[mask], dp_data[mask], color=colors[i % len(colors)], label=f'{column_name} (Data)')
+        plt.scatter(gpm_data[~mask], dp_data[~mask], color=colors[i % len(colors)], marker='x', s=100, label=f'{column_name} (Outliers)')
+        plt.plot(gpm_fit, dp_fit, color=colors[i % len(colors)], linestyle='--', label=f'{column_name} (Fit)')
+
+        # Display information on the plot
+        plt.text(0.05, 0.95 - 0.12 * i,  # Adjusted spacing factor to give more room between text blocks
+            f'{column_name}:\n'
+            f'Cv = {Cv_best:.4f}\n'
+            f'Iterations = {iterations}\n'
+            f'Threshold = {threshold} std dev\n\n\n\n',  # Added extra empty lines for spacing
+            transform=plt.gca().transAxes,
+            verticalalignment='top',
+            color=colors[i % len(colors)],
+            bbox=dict(facecolor='white', alpha=0.7, edgecolor='none'),
+            fontsize=12
+        )
+
+        print(f"Results for {column_name}:")
+        print(f"  Best-fit Cv: {Cv_best:.4f}")
+        lower, upper, std = cv_confidence_interval(gpm_data, dp_data, mask, n_resamples=n_resamples,
+                                                   confidence=confidence, seed=i)
+        print(f"  {confidence:.0%} CI (bootstrap): [{lower:.4f}, {upper:.4f}], std error {std:.4f}")
+        print(f"  Iterations: {iterations}")
+        print(f"  Outliers detected: {np.sum(~mask)}")
+        if np.any(~mask):
+            print(f"  Outlier GPM values: {gpm_data[~mask]}")
+        print()
+
+    plt.xlabel('Flow Rate, gpm')
+    plt.ylabel('Pressure Drop, psi')
+    plt.title(f'Flow Rate vs Pressure Drop - Iterative Curve Fitting for {num_datasets} Datasets')
+    plt.legend()
+    plt.grid(True)
+
+    plt.tight_layout()
+    plt.show()
+
+if __name__ == "__main__":
+    main()
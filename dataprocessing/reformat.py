@@ -1,165 +1,246 @@
+import re
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 
-def extract_names(input_file):
-    # Open and read the input file
-    with open(input_file, 'r') as file:
-        lines = file.readlines()
-    
-    # Initialize an empty list to store the strings
-    STR = []
-    
-    # Iterate through the lines to find `[Name]` sections
-    for i in range(len(lines)):
-        line = lines[i].strip()
-        if line.startswith("[Name]"):
-            # The string after `[Name]` is the name we want to extract
-            if i + 1 < len(lines):  # Ensure there is a next line
-                name = lines[i + 1].strip()
-                STR.append(name)
-    
-    return STR
-
-def process_csv(file_path, output_path):
-    # Read the file line by line
-    with open(file_path, 'r') as f:
-        lines = f.readlines()
-
-    # Initialize variables
-    blocks = []
-    current_block = []
-
-    # Divide content into blocks based on your predefined structure
-    for line in lines:
-        if line.strip():  # Non-blank line
-            current_block.append(line.strip())
-        else:  # Blank line
-            if current_block:  # End of a block
-                blocks.append(current_block)
-                current_block = []
-    
-    # Add the last block if it exists
-    if current_block:
-        blocks.append(current_block)
-
-    # Prepare the output DataFrame
-    max_rows = max(len(block) for block in blocks)  # Determine the maximum block length
-    data = pd.DataFrame(index=range(max_rows))  # Create an empty DataFrame with enough rows
-
-    # Populate the columns based on blocks
-    for i, block in enumerate(blocks):
-        col_index = i * 3  # Each block occupies three columns (Header, Time, Value)
-        header = [block[0]] if len(block) > 0 else ['']
-        time_value_pairs = [line.split(',') for line in block[1:]]
-
-        # Extract time and value pairs into separate columns
-        times = [pair[0].strip() if len(pair) > 1 else '' for pair in time_value_pairs]
-        values = [pair[1].strip() if len(pair) > 1 else '' for pair in time_value_pairs]
-
-        # Add columns to the DataFrame
-        data.insert(col_index, f'Header_{i + 1}', pd.Series(header + [''] * (max_rows - len(header))))
-        data.insert(col_index + 1, f'Time_{i + 1}', pd.Series(times + [''] * (max_rows - len(times))))
-        data.insert(col_index + 2, f'Value_{i + 1}', pd.Series(values + [''] * (max_rows - len(values))))
-
-    # Save the processed DataFrame to a new CSV file
-    data.to_csv(output_path, index=False)
-
-# Example usage:
-process_csv('test.csv', 'processed_test.csv')
-
-def unitConvert_csv(input_file, output_file):
-    # Read the original CSV file
-    df = pd.read_csv(input_file, header=None)  # Read without assuming headers
-    
-    # Extract headers from the first two rows and combine them
-    headers = (df.iloc[0].fillna('') + " " + df.iloc[1].fillna('')).str.strip()  # Ensure headers are strings and remove extra spaces
-    
-    # Extract data rows starting from row index 2
-    data = df.iloc[2:].reset_index(drop=True)
-    
-    # Process each column based on its type (Time or Value)
-    processed_data = pd.DataFrame()
-
-    for column in data.columns:
-        column_header = str(headers[column])  # Ensure the header is treated as a string
-        if "Time" in column_header:
-            # Divide Time [s] values by 60 to convert to minutes and round to 2 decimals
-            processed_data[column_header] = (pd.to_numeric(data[column], errors='coerce') / 60).round(2)
-        elif "Value" in column_header:
-            # Subtract temperature values by 273 and round to 2 decimals
-            processed_data[column_header] = (pd.to_numeric(data[column], errors='coerce') - 273).round(2)
-    
-    # Save the processed data to a new CSV file
-    processed_data.to_csv(output_file, index=False)
-    print(f"Processed file saved as: {output_file}")
-
-# Example usage:
-unitConvert_csv('processed_test.csv', 'unitConverted_test.csv')
-
-def process_columns(input_path, output_path):
-    # Load the processed CSV into a DataFrame
-    df = pd.read_csv(input_path)
-
-    # Initialize a list to store the indices of columns to keep
-    cols_to_keep = []
-    i = 0
-
-    # Loop through columns in chunks of 4 (2 to delete + 2 to keep)
-    while i < df.shape[1]:
-        # Skip the first 2 columns in the chunk
-        i += 2
-        # Add the next 2 columns (if they exist) to the list of columns to keep
-        if i < df.shape[1]:
-            cols_to_keep.extend(range(i, min(i + 2, df.shape[1])))
-        # Move to the next chunk
-        i += 2
-
-    # Keep only the selected columns
-    df = df.iloc[:, cols_to_keep]
-
-    # Save the updated DataFrame to a new CSV file
-    df.to_csv(output_path, index=False)
-    print(f"Processed file saved as: {output_path}")
-
-# Example usage:
-process_columns('unitConverted_test.csv', 'final_processed_test.csv')
-
-# Convert and save as XLSX
-df = pd.read_csv('final_processed_test.csv')
-
-# df = df.drop(index=0)
-
-# Replace all 'Time_*' column names with 'Time [s]'
-df.columns = [col if not col.startswith('Time_') else 'Time [s]' for col in df.columns]
-
-# Replace all 'Value_*' column names with STR[0], STR[1], etc.
-value_columns = [col for col in df.columns if col.startswith('Value_')]
-STR = extract_names('test.csv')
-
-for i, col in enumerate(value_columns):
-    df.rename(columns={col: STR[i]}, inplace=True)
-
-# Rename columns for easier manipulation
-df.columns = [
-    'Time [s]', 'Max Temp Case Elevated MaxT',
-    'Time [s].1', 'Max Temp Case Worst MaxT',
-    'Time [s].2', 'Min Temp Case Elevated MinT',
-    'Time [s].3', 'Min Temp Case Worst MinT',
-    'Time [s].4', 'Max Temp Case Lowered MaxT',
-    'Time [s].5', 'Min Temp Case Lowered MinT'
-]
-
-# Rename the time columns to Time [min], temperature columns to match the new names
-df.columns = [
-    'Time [min]', 'MaxT @Elevated [C]',
-    'Time [min]', 'MaxT @Nominal [C]',
-    'Time [min]', 'MinT @Elevated [C]',
-    'Time [min]', 'MinT @Nominal [C]',
-    'Time [min]', 'MaxT @Lowered [C]',
-    'Time [min]', 'MinT @Lowered [C]'
-]
-
-# Save the modified DataFrame to a new Excel file
-output_file_path = 'final_processed_test_modified.xlsx'
-df.to_excel(output_file_path, index=False)
-
-print(f"Modified data saved to {output_file_path}")
+# One monitor series of a CFD export: the [Name] text, the units of the
+# [Data] header columns and the parsed time/value samples as float64 arrays
+MonitorSeries = namedtuple('MonitorSeries', ['name', 'units', 'time', 'value'])
+
+# Linear units as (dimension, scale, offset): value in the dimension's base
+# unit = value * scale + offset
+UNITS = {
+    's': ('time', 1.0, 0.0),
+    'min': ('time', 60.0, 0.0),
+    'h': ('time', 3600.0, 0.0),
+    'K': ('temperature', 1.0, 0.0),
+    'C': ('temperature', 1.0, 273.15),
+    'F': ('temperature', 5 / 9, 273.15 - 32 * 5 / 9),
+    'Pa': ('pressure', 1.0, 0.0),
+    'kPa': ('pressure', 1e3, 0.0),
+    'bar': ('pressure', 1e5, 0.0),
+    'psi': ('pressure', 6894.757293168, 0.0),
+}
+
+# Spellings found in export headers mapped to the registry keys
+UNIT_ALIASES = {'sec': 's', 'degC': 'C', '°C': 'C', 'degF': 'F', '°F': 'F'}
+
+# Target unit per dimension; a dict with the same layout can be passed instead
+UNIT_SYSTEMS = {
+    'si': {'time': 's', 'temperature': 'K', 'pressure': 'Pa'},
+    'process': {'time': 'min', 'temperature': 'C', 'pressure': 'bar'},
+}
+
+UNIT_PATTERN = re.compile(r'\[\s*([^\]]*?)\s*\]')
+
+@lru_cache(maxsize=None)
+def parse_header_units(header):
+    """Return the units annotated as '[ unit ]' in each column of a [Data] header."""
+    units = []
+    for column in header.split(','):
+        match = UNIT_PATTERN.search(column)
+        unit = match.group(1) if match else ''
+        units.append(UNIT_ALIASES.get(unit, unit))
+    return tuple(units)
+
+def conversion_factors(unit, target):
+    """Return (scale, offset, new unit) converting unit into the target system."""
+    if unit not in UNITS:
+        return 1.0, 0.0, unit
+    dimension, scale, offset = UNITS[unit]
+    new_unit = target.get(dimension, unit)
+    _, new_scale, new_offset = UNITS[new_unit]
+    return scale / new_scale, (offset - new_offset) / new_scale, new_unit
+
+def iter_monitor_series(file_path):
+    """Stream the [Name]/[Data] blocks of a monitor export one series at a time.
+
+    The file is walked once line by line. Samples are accumulated in compact
+    C double arrays and handed out as float64 NumPy arrays, so memory use is
+    bounded by the largest single series rather than the whole export.
+    """
+    name = None
+    header = None
+    times = values = None
+    state = None  # 'name', 'header', 'data' or None
+
+    def finish():
+        return MonitorSeries(name, parse_header_units(header),
+                             np.frombuffer(times, dtype=np.float64),
+                             np.frombuffer(values, dtype=np.float64))
+
+    with open(file_path, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+
+            if line == '[Name]':
+                if state == 'data':
+                    yield finish()
+                state, name, header = 'name', None, None
+            elif line == '[Data]':
+                state = 'header'
+            elif state == 'name':
+                name = line
+                state = None
+            elif state == 'header':
+                header = line
+                times, values = array('d'), array('d')
+                state = 'data'
+            elif state == 'data':
+                time, value = line.split(',', 1)
+                times.append(float(time))
+                values.append(float(value))
+
+    if state == 'data':
+        yield finish()
+
+def read_monitor_export(file_path):
+    """Parse a monitor export into a long table.
+
+    Columns are series, time, value, time_unit and value_unit; the name and
+    unit columns are categorical so they cost one byte per row.
+    """
+    series = list(iter_monitor_series(file_path))
+    lengths = [len(s.time) for s in series]
+
+    def categorical(labels):
+        # Repeated labels share one category
+        categories = list(dict.fromkeys(labels))
+        codes = [categories.index(label) for label in labels]
+        return pd.Categorical.from_codes(np.repeat(codes, lengths), categories=categories)
+
+    return pd.DataFrame({
+        'series': categorical([s.name for s in series]),
+        'time': np.concatenate([s.time for s in series]) if series else np.empty(0),
+        'value': np.concatenate([s.value for s in series]) if series else np.empty(0),
+        'time_unit': categorical([s.units[0] if s.units else '' for s in series]),
+        'value_unit': categorical([s.units[1] if len(s.units) > 1 else '' for s in series]),
+    })
+
+def convert_column(values, units, target):
+    """Convert a column in one pass using per-unit factors indexed by category code."""
+    factors = [conversion_factors(unit, target) for unit in units.cat.categories]
+    scales = np.array([factor[0] for factor in factors])
+    offsets = np.array([factor[1] for factor in factors])
+    codes = units.cat.codes.to_numpy()
+    converted = values.to_numpy() * scales[codes] + offsets[codes]
+    # Different source units may map onto the same target unit
+    labels = [factor[2] for factor in factors]
+    categories = list(dict.fromkeys(labels))
+    remap = np.array([categories.index(label) for label in labels], dtype=int)
+    new_units = pd.Categorical.from_codes(remap[codes], categories=categories)
+    return converted, new_units
+
+def convert_units(table, target='process', decimals=2):
+    """Convert the time and value columns to a target unit system.
+
+    The units come from the '[ unit ]' annotations of the export headers, and
+    each column is converted as a single vectorized operation whatever the
+    number of series. target is a UNIT_SYSTEMS name or a {dimension: unit}
+    dict. Columns without a known unit are left unchanged.
+    """
+    if isinstance(target, str):
+        target = UNIT_SYSTEMS[target]
+    table = table.copy()
+    for column in ('time', 'value'):
+        converted, units = convert_column(table[column], table[f'{column}_unit'], target)
+        table[column] = converted.round(decimals) if decimals is not None else converted
+        table[f'{column}_unit'] = units
+    return table
+
+def select_series(table, names):
+    """Keep only the listed series, in the order given."""
+    table = table[table['series'].isin(names)]
+    table = table.assign(series=table['series'].cat.set_categories(names))
+    return table.sort_values('series', kind='stable').reset_index(drop=True)
+
+def rename_series(table, mapping):
+    """Rename series using a {old name: new name} mapping."""
+    return table.assign(series=table['series'].cat.rename_categories(
+        lambda name: mapping.get(name, name)))
+
+def to_wide(table, time_label=None):
+    """Lay the long table out as side-by-side (time, value) column pairs per series.
+
+    The time columns are labelled 'Time [unit]' from each series' time unit
+    unless a time_label is given.
+    """
+    columns = []
+    for name, group in table.groupby('series', observed=True, sort=False):
+        label = time_label
+        if label is None:
+            unit = group['time_unit'].iloc[0] if len(group) else ''
+            label = f"Time [{unit}]" if unit else 'Time'
+        columns.append(pd.DataFrame({label: group['time'].to_numpy(),
+                                     name: group['value'].to_numpy()}))
+    return pd.concat(columns, axis=1)
+
+class MonitorPipeline:
+    """Lazy chain of processing stages over one in-memory monitor table.
+
+    Stages are only recorded when added and run in order by run(), starting
+    from a single read of the export. With debug=True the table after every
+    stage is written to '<prefix>_<n>_<stage>.csv' for inspection.
+    """
+
+    def __init__(self, input_file, debug=False, debug_prefix=None):
+        self.input_file = input_file
+        self.debug = debug
+        self.debug_prefix = debug_prefix or input_file.rsplit('.', 1)[0]
+        self.stages = []
+
+    def add_stage(self, name, function, *args, **kwargs):
+        self.stages.append((name, function, args, kwargs))
+        return self
+
+    def convert_units(self, **kwargs):
+        return self.add_stage('unitConverted', convert_units, **kwargs)
+
+    def select(self, names):
+        return self.add_stage('selected', select_series, names)
+
+    def rename(self, mapping):
+        return self.add_stage('renamed', rename_series, mapping)
+
+    def run(self):
+        table = read_monitor_export(self.input_file)
+        self.write_debug(0, 'parsed', table)
+        for index, (name, function, args, kwargs) in enumerate(self.stages, start=1):
+            table = function(table, *args, **kwargs)
+            self.write_debug(index, name, table)
+        return table
+
+    def write_debug(self, index, name, table):
+        if self.debug:
+            debug_file = f"{self.debug_prefix}_{index}_{name}.csv"
+            table.to_csv(debug_file, index=False)
+            print(f"Intermediate table saved as: {debug_file}")
+
+    def to_excel(self, output_file, time_label=None):
+        """Run the pipeline and write the wide table as the only output file."""
+        data = to_wide(self.run(), time_label)
+        data.to_excel(output_file, index=False)
+        return data
+
+# Final column names of the temperature monitors in test.csv
+SERIES_LABELS = {
+    'Max Temp for Case elevated at MaxT': 'MaxT @Elevated [C]',
+    'Max Temp for Case Worst Case at MaxT': 'MaxT @Nominal [C]',
+    'Min Temp for Case elevated at MinT': 'MinT @Elevated [C]',
+    'Min Temp for Case Worst Case at MinT': 'MinT @Nominal [C]',
+    'Max Temp for Case lowered at MaxT': 'MaxT @Lowered [C]',
+    'Min Temp for Case lowered at MinT': 'MinT @Lowered [C]',
+}
+
+if __name__ == "__main__":
+    # One read of the export, conversion and renaming in memory, one write
+    pipeline = MonitorPipeline('test.csv', debug=False).convert_units().rename(SERIES_LABELS)
+
+    output_file_path = 'final_processed_test_modified.xlsx'
+    pipeline.to_excel(output_file_path)
+
+    print(f"Modified data saved to {output_file_path}")
@@ -4,18 +4,64 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from mpl_toolkits.mplot3d import Axes3D
+from orbit_integrators import G, INTEGRATORS, initial_conditions, specific_energy
+from nbody import simulate_nbody
+from orbit_animation import MarkerAnimation
+from sim_worker import SimulationWorker
+
+def compute_orbit(progress, integrator, r, v, mu, dt, steps, chunk_steps=2000):
+    """Integrate in chunks of steps, streaming the trajectory computed so far."""
+    trajectory = np.empty((steps + 1, 3))
+    velocities = np.empty((steps + 1, 3))
+    trajectory[0] = r
+    velocities[0] = v
+    done = 0
+    while done < steps:
+        if progress.cancelled:
+            return None
+        count = min(chunk_steps, steps - done)
+        positions, chunk_velocities = integrator(trajectory[done], velocities[done], mu, dt, count)
+        trajectory[done:done + count + 1] = positions
+        velocities[done:done + count + 1] = chunk_velocities
+        done += count
+        progress.report(trajectory[:done + 1])
+
+    energy = specific_energy(trajectory, velocities, mu)
+    return trajectory, f"{integrator.__name__}: relative energy drift {abs(energy[-1] / energy[0] - 1):.3e}"
+
+def compute_two_body_orbit(progress, r, v, center_mass, particle_mass, dt, steps, chunk_steps=2000):
+    """Earth and Moon as an N-body system in the barycentric frame,
+    returned as the Moon's position relative to the Earth."""
+    def report(positions):
+        # Stream the orbit between chunks, or stop if this run was superseded
+        if progress.cancelled:
+            return True
+        progress.report(positions[:, 1] - positions[:, 0])
+        return False
+
+    positions, diagnostics = simulate_nbody(np.array([np.zeros(3), r]), np.array([np.zeros(3), v]),
+                                            np.array([center_mass, particle_mass]), dt, steps,
+                                            callback=report, callback_every=chunk_steps)
+    if progress.cancelled:
+        return None
+    return positions[:, 1] - positions[:, 0], (f"N-body: relative energy drift {diagnostics['energy_drift'][-1]:.3e}, "
+                                               f"momentum drift {diagnostics['momentum_drift'][-1]:.3e}")
 
 class GravitySimulation:
     def __init__(self, master):
         self.master = master
         self.master.title("Earth-Moon 3D Gravity Simulation")
 
-        self.G = 6.67430e-11  # Gravitational constant
+        self.G = G  # Gravitational constant
         self.steps = 20000  # Number of simulation steps
+        self.animation = None
 
         self.create_widgets()
         self.create_plot()
 
+        # Integration runs in the background; a new Simulate click cancels the running one
+        self.worker = SimulationWorker(master)
+
     def create_widgets(self):
         tk.Label(self.master, text="Earth Mass (kg):").grid(row=0, column=0)
         self.center_mass = tk.Entry(self.master)
@@ -47,14 +93,30 @@ class GravitySimulation:
         self.inclination.insert(0, "5.14")  # Moon's orbital inclination
         self.inclination.grid(row=5, column=1)
 
-        tk.Button(self.master, text="Simulate", command=self.simulate).grid(row=6, column=0, columnspan=2)
+        tk.Label(self.master, text="Integrator:").grid(row=6, column=0)
+        self.integrator = tk.StringVar(value='Leapfrog')
+        tk.OptionMenu(self.master, self.integrator, *INTEGRATORS).grid(row=6, column=1)
+
+        self.two_body = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.master, text="N-body (Moon mass pulls on Earth)", variable=self.two_body).grid(row=7, column=0, columnspan=2)
+
+        tk.Label(self.master, text="Playback Speed:").grid(row=8, column=0)
+        self.speed = tk.Scale(self.master, from_=0.25, to=4.0, resolution=0.25, orient=tk.HORIZONTAL,
+                              command=self.change_speed)
+        self.speed.set(1.0)
+        self.speed.grid(row=8, column=1)
+
+        self.rotate = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.master, text="Rotate view (full redraw per frame)", variable=self.rotate).grid(row=9, column=0, columnspan=2)
+
+        tk.Button(self.master, text="Simulate", command=self.simulate).grid(row=10, column=0, columnspan=2)
 
 
     def create_plot(self):
         self.fig = plt.figure(figsize=(10, 10))
         self.ax = self.fig.add_subplot(111, projection='3d')
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.master)
-        self.canvas.get_tk_widget().grid(row=7, column=0, columnspan=2)
+        self.canvas.get_tk_widget().grid(row=11, column=0, columnspan=2)
 
     def simulate(self):
         try:
@@ -62,72 +124,83 @@ class GravitySimulation:
             initial_distance = float(self.initial_distance.get())
             initial_velocity = float(self.initial_velocity.get())
             self.dt = float(self.time_step.get())
-            inclination = float(self.inclination.get()) * np.pi / 180  # Convert to radians
+            inclination = float(self.inclination.get())
 
             # Initial conditions
-            r = np.array([initial_distance, 0, 0])
-            v = np.array([0, initial_velocity * np.cos(inclination), initial_velocity * np.sin(inclination)])
-
-            self.trajectory = [r]
-
-            for _ in range(self.steps):
-                r_mag = np.linalg.norm(r)
-                if r_mag == 0:
-                    break  # Avoid division by zero
-                a = -self.G * center_mass * r / r_mag**3
-                v += a * self.dt
-                r += v * self.dt
-                self.trajectory.append(r)
-
-            self.trajectory = np.array(self.trajectory)
-
-            self.ax.clear()
-            max_val = np.max(np.abs(self.trajectory)) * 1.1
-            self.ax.set_xlim(-max_val, max_val)
-            self.ax.set_ylim(-max_val, max_val)
-            self.ax.set_zlim(-max_val, max_val)
-            
-            self.ax.set_xlabel('X position (m)')
-            self.ax.set_ylabel('Y position (m)')
-            self.ax.set_zlabel('Z position (m)')
-            self.ax.set_title('Moon Orbit Around Earth (3D)')
-
-            # Plot full orbit path
-            self.ax.plot(self.trajectory[:, 0], self.trajectory[:, 1], self.trajectory[:, 2], 'r-', alpha=0.3, label='Moon Orbit')
-            
-            # Plot Earth
-            self.earth = self.ax.scatter([0], [0], [0], color='blue', s=200, label='Earth')
-            
-            # Initialize Moon (will be updated in animation)
-            self.moon = self.ax.scatter([], [], [], color='green', s=100, label='Moon')
-
-            self.ax.legend()
-
-            # Initialize frame counter for animation
-            self.frame = 0
-            
-            # Start animation
-            if hasattr(self.master, '_after_id'):
-                self.master.after_cancel(self.master._after_id)
-            
-            self.update_animation()
-            
+            r, v = initial_conditions(initial_distance, initial_velocity, inclination)
+
+            # Stop the previous playback; its run is cancelled by the worker
+            if self.animation is not None:
+                self.animation.disconnect()
+                self.animation = None
+            self.prepare_axes(max(initial_distance, 1.0) * 1.5)
+            self.partial_orbit, = self.ax.plot([], [], [], 'r-', alpha=0.3)
+            self.canvas.draw_idle()
+
+            if self.two_body.get():
+                particle_mass = float(self.particle_mass.get())
+                self.worker.submit(compute_two_body_orbit, r, v, center_mass, particle_mass, self.dt, self.steps,
+                                   on_partial=self.show_partial, on_result=self.show_trajectory,
+                                   on_error=self.show_error)
+            else:
+                mu = self.G * center_mass
+                self.worker.submit(compute_orbit, INTEGRATORS[self.integrator.get()], r, v, mu, self.dt, self.steps,
+                                   on_partial=self.show_partial, on_result=self.show_trajectory,
+                                   on_error=self.show_error)
+
         except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
-
-    def update_animation(self):
-        if self.frame < len(self.trajectory):
-            # Update Moon position
-            self.moon._offsets3d = (self.trajectory[self.frame:self.frame+1, 0],
-                                    self.trajectory[self.frame:self.frame+1, 1],
-                                    self.trajectory[self.frame:self.frame+1, 2])
-            
-            self.ax.view_init(elev=20, azim=self.frame/100)  # Rotate view
-            self.canvas.draw()
-            self.frame += 1
-            self.master._after_id = self.master.after(50, self.update_animation)
-        else:
-            self.frame = 0  # Reset for next simulation
+            self.show_error(e)
+
+    def show_error(self, e):
+        messagebox.showerror("Error", f"An error occurred: {str(e)}")
+
+    def prepare_axes(self, max_val):
+        self.ax.clear()
+        self.ax.set_xlim(-max_val, max_val)
+        self.ax.set_ylim(-max_val, max_val)
+        self.ax.set_zlim(-max_val, max_val)
+
+        self.ax.set_xlabel('X position (m)')
+        self.ax.set_ylabel('Y position (m)')
+        self.ax.set_zlabel('Z position (m)')
+        self.ax.set_title('Moon Orbit Around Earth (3D)')
+
+    def show_partial(self, trajectory):
+        # Extend the orbit path as chunks of the integration arrive
+        self.partial_orbit.set_data_3d(trajectory[:, 0], trajectory[:, 1], trajectory[:, 2])
+        self.canvas.draw_idle()
+
+    def show_trajectory(self, result):
+        trajectory, summary = result
+        if not np.all(np.isfinite(trajectory)):
+            # E.g. a zero initial distance, where the acceleration is infinite
+            self.show_error("the orbit diverged; check the initial distance and time step")
+            return
+        self.trajectory = trajectory
+        print(summary)
+
+        self.prepare_axes(np.max(np.abs(self.trajectory)) * 1.1)
+
+        # Plot full orbit path
+        self.ax.plot(self.trajectory[:, 0], self.trajectory[:, 1], self.trajectory[:, 2], 'r-', alpha=0.3, label='Moon Orbit')
+
+        # Plot Earth
+        self.earth = self.ax.scatter([0], [0], [0], color='blue', s=200, label='Earth')
+
+        # Initialize Moon (will be updated in animation)
+        self.moon, = self.ax.plot([], [], [], 'o', color='green', markersize=10, label='Moon')
+
+        self.ax.legend()
+
+        # Start animation: 20 s of playback at 30 frames/s, whatever the step count
+        self.animation = MarkerAnimation(self.master, self.canvas, self.ax, self.moon, self.trajectory,
+                                         fps=30, duration=20.0, speed=self.speed.get(),
+                                         rotate=self.rotate.get())
+        self.animation.start()
+
+    def change_speed(self, value):
+        if self.animation is not None:
+            self.animation.set_speed(value)
 
 root = tk.Tk()
 app = GravitySimulation(root)
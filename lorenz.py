@@ -1,8 +1,8 @@
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D
 from scipy.integrate import odeint
-from matplotlib.animation import FuncAnimation
+from lorenz_animation import animate, export_animation
 
 def lorenz_system(state, t, sigma, rho, beta):
     x, y, z = state
@@ -11,57 +11,38 @@ def lorenz_system(state, t, sigma, rho, beta):
     dz = x * y - beta * z
     return [dx, dy, dz]
 
-# Set parameters
-sigma = 10
-rho = 28
-beta = 8/3
+def main():
+    parser = argparse.ArgumentParser(description="Animate the Lorenz attractor.")
+    parser.add_argument('-o', '--output', help="render headless to this .mp4 or .gif instead of showing the animation")
+    parser.add_argument('--trail', type=int, default=1500, help="trail length in samples")
+    parser.add_argument('--fps', type=int, default=30, help="frame rate of the exported video")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="worker processes for rendering frames")
+    args = parser.parse_args()
 
-# Set initial conditions
-initial_state = [1.0, 1.0, 1.0]
+    # Set parameters
+    sigma = 10
+    rho = 28
+    beta = 8/3
 
-# Set time points
-t = np.linspace(0, 100, 10000)
+    # Set initial conditions
+    initial_state = [1.0, 1.0, 1.0]
 
-# Solve ODE
-solution = odeint(lorenz_system, initial_state, t, args=(sigma, rho, beta))
+    # Set time points
+    t = np.linspace(0, 100, 10000)
 
-# Extract x, y, z coordinates
-x = solution[:, 0]
-y = solution[:, 1]
-z = solution[:, 2]
+    # Solve ODE
+    solution = odeint(lorenz_system, initial_state, t, args=(sigma, rho, beta))
 
-# Create 3D plot
-fig = plt.figure(figsize=(10, 8))
-ax = fig.add_subplot(111, projection='3d')
+    if args.output:
+        export_animation(args.output, solution, step=20, fps=args.fps, trail_length=args.trail, workers=args.workers)
+        return
 
-# Initialize the plot
-line, = ax.plot([], [], [], lw=0.5)
-point, = ax.plot([], [], [], 'ro', markersize=5)
+    # Create 3D plot with a fading trail behind the moving point
+    fig = plt.figure(figsize=(10, 8))
+    anim = animate(fig, solution, step=20, interval=50, trail_length=args.trail)
 
-# Set labels and title
-ax.set_xlabel('X')
-ax.set_ylabel('Y')
-ax.set_zlabel('Z')
-ax.set_title('Lorenz Attractor')
+    # Show the plot
+    plt.show()
 
-# Set axis limits
-ax.set_xlim(min(x), max(x))
-ax.set_ylim(min(y), max(y))
-ax.set_zlim(min(z), max(z))
-
-# Animation update function
-def update(frame):
-    line.set_data(x[:frame], y[:frame])
-    line.set_3d_properties(z[:frame])
-    point.set_data([x[frame]], [y[frame]])
-    point.set_3d_properties([z[frame]])
-    return line, point
-
-# Create animation
-anim = FuncAnimation(fig, update, frames=range(0, len(x), 20), interval=50, blit=True, repeat=False)
-
-# Show the plot
-plt.show()
-
-# Optionally, save the animation (uncomment the line below if you want to save it)
-# anim.save('lorenz_attractor.gif', writer='pillow', fps=30)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
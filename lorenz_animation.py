@@ -0,0 +1,172 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import matplotlib
+from matplotlib.animation import FuncAnimation
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+class FadingTrail:
+    """Fixed-length trail behind a moving point, kept in a ring buffer of line segments.
+
+    The buffer holds the last `length` segments of the trajectory. Moving
+    forward only writes the segments added since the previous frame and
+    rolls the fade ramp to the new head, so the cost of a frame does not
+    grow with how far the animation has played.
+    """
+
+    def __init__(self, collection, trajectory, length, color='C0'):
+        self.collection = collection
+        self.trajectory = trajectory
+        self.length = length
+        self.segments = np.zeros((length, 2, 3))
+        # Colours from the oldest segment (faint) to the newest (opaque)
+        self.ramp = np.tile(to_rgba(color), (length, 1))
+        self.ramp[:, 3] = np.linspace(0, 1, length + 1)[1:]
+        self.reset()
+
+    def reset(self):
+        self.head = 0
+        self.filled = 0
+        self.position = 0
+
+    def push(self, stop):
+        """Append the segments between the current position and sample `stop`."""
+        start = max(self.position, stop - self.length)
+        new = np.stack([self.trajectory[start:stop], self.trajectory[start + 1:stop + 1]], axis=1)
+        slots = (self.head + np.arange(len(new))) % self.length
+        self.segments[slots] = new
+        self.head = (self.head + len(new)) % self.length
+        self.filled = min(self.length, self.filled + len(new))
+        self.position = stop
+
+    def seek(self, index):
+        """Move to sample `index`, refilling the buffer unless it is a short step forward."""
+        if index < self.position:
+            self.reset()
+        self.push(index)
+        self.update_artist()
+
+    def update_artist(self):
+        if self.filled < self.length:
+            # Not wrapped yet: slots 0..filled-1 are already oldest to newest
+            self.collection.set_segments(self.segments[:self.filled])
+            self.collection.set_color(self.ramp[self.length - self.filled:])
+        else:
+            self.collection.set_segments(self.segments)
+            self.collection.set_color(np.roll(self.ramp, self.head, axis=0))
+
+class LorenzScene:
+    """Axes with a fading trail and a marker for drawing any frame of a trajectory."""
+
+    def __init__(self, fig, trajectory, trail_length=1500, animated=False):
+        self.trajectory = np.asarray(trajectory, dtype=float)
+        self.ax = fig.add_subplot(111, projection='3d')
+        collection = Line3DCollection([], lw=0.8, animated=animated)
+        self.ax.add_collection(collection)
+        self.trail = FadingTrail(collection, self.trajectory, trail_length)
+        self.point, = self.ax.plot([], [], [], 'ro', markersize=5, animated=animated)
+
+        self.ax.set_xlabel('X')
+        self.ax.set_ylabel('Y')
+        self.ax.set_zlabel('Z')
+        self.ax.set_title('Lorenz Attractor')
+        low, high = self.trajectory.min(axis=0), self.trajectory.max(axis=0)
+        self.ax.set_xlim(low[0], high[0])
+        self.ax.set_ylim(low[1], high[1])
+        self.ax.set_zlim(low[2], high[2])
+
+    def show(self, index):
+        self.trail.seek(index)
+        x, y, z = self.trajectory[index]
+        self.point.set_data_3d([x], [y], [z])
+        return self.trail.collection, self.point
+
+def animate(fig, trajectory, step=20, interval=50, trail_length=1500):
+    """Interactive FuncAnimation of the trajectory, advancing `step` samples per frame."""
+    scene = LorenzScene(fig, trajectory, trail_length, animated=True)
+    frames = range(0, len(scene.trajectory), step)
+    return FuncAnimation(fig, scene.show, frames=frames, interval=interval, blit=True, repeat=False)
+
+def render_frames(trajectory, indices, first_number, directory, trail_length, figsize, dpi):
+    """Render frames off-screen to numbered PNG files; runs in a worker process."""
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    scene = LorenzScene(fig, trajectory, trail_length)
+    for number, index in enumerate(indices, first_number):
+        scene.show(index)
+        fig.savefig(os.path.join(directory, f'frame_{number:05d}.png'), dpi=dpi,
+                    pil_kwargs={'compress_level': 1})
+    return len(indices)
+
+def encode_gif(frames, path, fps):
+    from PIL import Image
+    first = Image.open(frames[0])
+    # Frames are read one at a time as they are appended
+    first.save(path, save_all=True, append_images=(Image.open(frame) for frame in frames[1:]),
+               duration=int(1000 / fps), loop=0)
+
+def find_ffmpeg():
+    ffmpeg = shutil.which(matplotlib.rcParams['animation.ffmpeg_path'])
+    if ffmpeg is None:
+        raise RuntimeError("MP4 export needs ffmpeg; install it or set animation.ffmpeg_path")
+    return ffmpeg
+
+def encode_mp4(directory, path, fps, ffmpeg):
+    subprocess.run([ffmpeg, '-y', '-loglevel', 'error', '-framerate', str(fps),
+                    '-i', os.path.join(directory, 'frame_%05d.png'),
+                    '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', path], check=True)
+
+def export_animation(path, trajectory, step=20, fps=30, trail_length=1500, workers=None,
+                     frames_per_task=25, figsize=(10, 8), dpi=100):
+    """Render the animation headless to an .mp4 (through ffmpeg) or .gif file.
+
+    Frames are rendered to a temporary directory in tasks of
+    frames_per_task consecutive frames, over a process pool when
+    workers > 1; each task seeks its trail once and then advances it
+    frame by frame. Progress and the render and encode times are printed.
+    """
+    gif = path.lower().endswith('.gif')
+    ffmpeg = None if gif else find_ffmpeg()  # Fail before rendering, not after
+    trajectory = np.asarray(trajectory, dtype=float)
+    indices = np.arange(0, len(trajectory), step)
+    tasks = [(indices[start:start + frames_per_task], start) for start in range(0, len(indices), frames_per_task)]
+    settings = (trail_length, figsize, dpi)
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        rendered = 0
+
+        def report(count):
+            nonlocal rendered
+            rendered += count
+            rate = rendered / (time.perf_counter() - start)
+            print(f"Rendered {rendered}/{len(indices)} frames ({rate:.1f} frames/s)", end='\r', flush=True)
+
+        if workers and workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(render_frames, trajectory, task, first, directory, *settings)
+                           for task, first in tasks]
+                for future in as_completed(futures):
+                    report(future.result())
+        else:
+            for task, first in tasks:
+                report(render_frames(trajectory, task, first, directory, *settings))
+        render_time = time.perf_counter() - start
+        print()
+
+        start = time.perf_counter()
+        if gif:
+            frames = [os.path.join(directory, f'frame_{number:05d}.png') for number in range(len(indices))]
+            encode_gif(frames, path, fps)
+        else:
+            encode_mp4(directory, path, fps, ffmpeg)
+        encode_time = time.perf_counter() - start
+
+    print(f"Wrote {path}: {len(indices)} frames, rendered in {render_time:.1f} s, encoded in {encode_time:.1f} s")
@@ -0,0 +1,220 @@
+import argparse
+import time
+from collections import namedtuple
+import numpy as np
+import matplotlib.pyplot as plt
+from sweep_utils import map_batches, parameter_grid, parse_axis
+
+PARAMETERS = ('sigma', 'rho', 'beta')
+DEFAULTS = {'sigma': 10.0, 'rho': 28.0, 'beta': 8/3}
+
+LyapunovGrid = namedtuple('LyapunovGrid', ['axes', 'exponent', 'spread'])
+DivergenceStats = namedtuple('DivergenceStats', ['time', 'mean_log_separation', 'median_separation',
+                                                 'spread', 'growth_rate', 'predictability_time'])
+
+def lorenz_batch(states, sigma, rho, beta):
+    """Lorenz right-hand side for states of shape (N, 3); parameters are scalars or shape (N,)."""
+    x, y, z = states[:, 0], states[:, 1], states[:, 2]
+    return np.stack([sigma * (y - x), x * (rho - z) - y, x * y - beta * z], axis=1)
+
+def lorenz_tangent(states, tangents, sigma, rho, beta):
+    """Jacobian of the Lorenz system at each state applied to its tangent vector."""
+    x, y, z = states[:, 0], states[:, 1], states[:, 2]
+    u, v, w = tangents[:, 0], tangents[:, 1], tangents[:, 2]
+    return np.stack([sigma * (v - u), (rho - z) * u - v - x * w, y * u + x * v - beta * w], axis=1)
+
+def rk4_step(states, dt, sigma, rho, beta, tangents=None):
+    """One classical Runge-Kutta step of all states, and of their tangent vectors if given."""
+    k1 = lorenz_batch(states, sigma, rho, beta)
+    k2 = lorenz_batch(states + 0.5 * dt * k1, sigma, rho, beta)
+    k3 = lorenz_batch(states + 0.5 * dt * k2, sigma, rho, beta)
+    k4 = lorenz_batch(states + dt * k3, sigma, rho, beta)
+    if tangents is not None:
+        # Linearised equations along the same stages
+        l1 = lorenz_tangent(states, tangents, sigma, rho, beta)
+        l2 = lorenz_tangent(states + 0.5 * dt * k1, tangents + 0.5 * dt * l1, sigma, rho, beta)
+        l3 = lorenz_tangent(states + 0.5 * dt * k2, tangents + 0.5 * dt * l2, sigma, rho, beta)
+        l4 = lorenz_tangent(states + dt * k3, tangents + dt * l3, sigma, rho, beta)
+        tangents = tangents + dt / 6 * (l1 + 2 * l2 + 2 * l3 + l4)
+    return states + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4), tangents
+
+def lyapunov_chunk(states, sigma, rho, beta, dt, steps, transient, renormalize_every):
+    """Largest Lyapunov exponent of every state in one chunk (Benettin's method)."""
+    for _ in range(transient):
+        states, _ = rk4_step(states, dt, sigma, rho, beta)
+
+    tangents = np.ones_like(states) / np.sqrt(3)
+    log_growth = np.zeros(len(states))
+    for step in range(1, steps + 1):
+        states, tangents = rk4_step(states, dt, sigma, rho, beta, tangents)
+        if step % renormalize_every == 0 or step == steps:
+            norm = np.linalg.norm(tangents, axis=1)
+            log_growth += np.log(norm)
+            tangents /= norm[:, None]
+    return log_growth / (steps * dt)
+
+def largest_lyapunov(initial_states, sigma=10.0, rho=28.0, beta=8/3, dt=0.01, steps=20000, transient=1000,
+                     renormalize_every=10, workers=None, chunk_size=1024):
+    """Largest Lyapunov exponent for each of many initial states, integrated together.
+
+    The states (N, 3) and their tangent vectors advance as arrays through a
+    fixed-step RK4 scheme, after `transient` steps to settle onto the
+    attractor. sigma, rho and beta are scalars or shape (N,) arrays, so a
+    parameter grid runs as one ensemble. With workers > 1 the ensemble is
+    split into chunks over a process pool. Returns an (N,) array.
+    """
+    states = np.asarray(initial_states, dtype=float).reshape(-1, 3)
+    params = [np.broadcast_to(np.asarray(p, dtype=float), len(states)) for p in (sigma, rho, beta)]
+    bounds = list(range(0, len(states), chunk_size)) + [len(states)]
+    chunks = [(states[a:b],) + tuple(p[a:b] for p in params) for a, b in zip(bounds[:-1], bounds[1:])]
+    results = map_batches(lyapunov_chunk, chunks, (dt, steps, transient, renormalize_every), workers)
+    return np.concatenate(results)
+
+def perturbed_ensemble(state, members, perturbation=1e-8, seed=None):
+    """`members` copies of a state with random offsets of size `perturbation`; the first is unperturbed."""
+    rng = np.random.default_rng(seed)
+    offsets = rng.normal(size=(members, 3))
+    offsets *= perturbation / np.linalg.norm(offsets, axis=1)[:, None]
+    offsets[0] = 0.0
+    return np.asarray(state, dtype=float) + offsets
+
+def lyapunov_grid(sigma=10.0, rho=28.0, beta=8/3, runs_per_point=4, seed=None, **kwargs):
+    """Largest Lyapunov exponent over a grid of sigma, rho and beta values.
+
+    Each grid point is started from runs_per_point random states near
+    (1, 1, 1). Returns a LyapunovGrid with the swept axes and the mean
+    exponent and its spread (standard deviation over the runs) per point,
+    with one array dimension per swept parameter.
+    """
+    flat, swept = parameter_grid(PARAMETERS, DEFAULTS, sigma=sigma, rho=rho, beta=beta)
+    points = len(flat['sigma'])
+
+    rng = np.random.default_rng(seed)
+    states = 1.0 + rng.uniform(-0.5, 0.5, size=(points * runs_per_point, 3))
+    params = [np.repeat(flat[name], runs_per_point) for name in PARAMETERS]
+    exponents = largest_lyapunov(states, *params, **kwargs).reshape(points, runs_per_point)
+
+    shape = tuple(len(v) for v in swept.values())
+    return LyapunovGrid(swept, exponents.mean(axis=1).reshape(shape), exponents.std(axis=1).reshape(shape))
+
+def divergence_chunk(states, sigma, rho, beta, dt, steps, save_every):
+    """log10 separation of every member from member 0, every save_every steps."""
+    saves = steps // save_every + 1
+    log_separation = np.empty((saves, len(states) - 1))
+    for step in range(steps + 1):
+        if step % save_every == 0:
+            separation = np.linalg.norm(states[1:] - states[0], axis=1)
+            log_separation[step // save_every] = np.log10(np.maximum(separation, 1e-300))
+        if step < steps:
+            states, _ = rk4_step(states, dt, sigma, rho, beta)
+    return log_separation
+
+def divergence(initial_state=(1.0, 1.0, 1.0), members=1000, perturbation=1e-8, sigma=10.0, rho=28.0, beta=8/3,
+               dt=0.01, steps=5000, save_every=10, transient=1000, threshold=1.0, linear_limit=1e-3,
+               seed=None, workers=None, chunk_size=1024):
+    """Divergence of an ensemble of perturbed copies of one state.
+
+    The state is first moved onto the attractor by `transient` steps, then
+    `members` copies perturbed by `perturbation` are integrated and their
+    distances from the unperturbed copy recorded every save_every steps.
+    Returns DivergenceStats: the sample times, the ensemble mean of log10
+    separation, the median and RMS separations, the exponential growth
+    rate fitted while the median separation is below linear_limit (an
+    estimate of the largest Lyapunov exponent), and the time at which the
+    median separation first exceeds threshold (NaN if it never does).
+    """
+    state = np.asarray(initial_state, dtype=float)[None, :]
+    for _ in range(transient):
+        state, _ = rk4_step(state, dt, sigma, rho, beta)
+    states = perturbed_ensemble(state[0], members + 1, perturbation, seed)
+
+    # Every chunk carries the unperturbed reference as its first member
+    reference = states[:1]
+    chunks = [np.vstack([reference, states[1 + start:1 + start + chunk_size]])
+              for start in range(0, members, chunk_size)]
+    results = map_batches(divergence_chunk, [(chunk,) for chunk in chunks],
+                          (sigma, rho, beta, dt, steps, save_every), workers)
+    log_separation = np.hstack(results)
+
+    time_points = np.arange(log_separation.shape[0]) * save_every * dt
+    mean_log = log_separation.mean(axis=1)
+    median = 10 ** np.median(log_separation, axis=1)
+    spread = np.sqrt(np.mean(10 ** (2 * log_separation), axis=1))
+
+    # Exponential growth rate over the linear regime, skipping the initial alignment
+    linear = (median < linear_limit) & (time_points >= 1.0)
+    if linear.sum() >= 2:
+        growth_rate = np.polyfit(time_points[linear], mean_log[linear] * np.log(10), 1)[0]
+    else:
+        growth_rate = np.nan
+    crossed = np.nonzero(median > threshold)[0]
+    predictability_time = time_points[crossed[0]] if len(crossed) else np.nan
+    return DivergenceStats(time_points, mean_log, median, spread, growth_rate, predictability_time)
+
+def plot_divergence(stats):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(stats.time, stats.mean_log_separation, 'b-', label='Mean log10 separation')
+    ax.plot(stats.time, np.log10(stats.median_separation), 'r--', label='log10 median separation')
+    if np.isfinite(stats.predictability_time):
+        ax.axvline(stats.predictability_time, color='k', lw=0.8, label='Predictability time')
+    ax.set_xlabel('Time')
+    ax.set_ylabel('log10 separation')
+    ax.set_title(f'Lorenz Ensemble Divergence (growth rate {stats.growth_rate:.3f})')
+    ax.legend()
+    return fig
+
+def plot_lyapunov_grid(grid):
+    names = list(grid.axes)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    if len(names) == 1:
+        ax.errorbar(grid.axes[names[0]], grid.exponent, yerr=grid.spread, fmt='b.-')
+        ax.axhline(0, color='k', lw=0.8)
+        ax.set_xlabel(names[0])
+        ax.set_ylabel('Largest Lyapunov exponent')
+    else:
+        # First two swept axes; any third is fixed at its first value
+        values = grid.exponent[(slice(None), slice(None)) + (0,) * (len(names) - 2)]
+        mesh = ax.pcolormesh(grid.axes[names[0]], grid.axes[names[1]], values.T, shading='auto', cmap='coolwarm')
+        fig.colorbar(mesh, ax=ax, label='Largest Lyapunov exponent')
+        ax.set_xlabel(names[0])
+        ax.set_ylabel(names[1])
+    ax.set_title('Lorenz Largest Lyapunov Exponent')
+    return fig
+
+def main():
+    parser = argparse.ArgumentParser(description="Lyapunov exponents and ensemble divergence of the Lorenz system.")
+    parser.add_argument('mode', choices=['divergence', 'lyapunov'])
+    for name in PARAMETERS:
+        parser.add_argument(f'--{name}', type=parse_axis, default=[DEFAULTS[name]],
+                            help="value, list a,b,c or range start:stop:count (lyapunov mode sweeps these)")
+    parser.add_argument('-m', '--members', type=int, default=1000, help="ensemble size for divergence mode")
+    parser.add_argument('--steps', type=int, default=None, help="integration steps")
+    parser.add_argument('--dt', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('-j', '--workers', type=int, default=None, help="number of worker processes")
+    parser.add_argument('-o', '--output', help="save the figure instead of showing it")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.mode == 'divergence':
+        stats = divergence(members=args.members, sigma=args.sigma[0], rho=args.rho[0], beta=args.beta[0],
+                           dt=args.dt, steps=args.steps or 5000, seed=args.seed, workers=args.workers)
+        print(f"{args.members} members in {time.perf_counter() - start:.2f} s: growth rate {stats.growth_rate:.4f}, "
+              f"predictability time {stats.predictability_time:.2f}")
+        fig = plot_divergence(stats)
+    else:
+        grid = lyapunov_grid(args.sigma, args.rho, args.beta, seed=args.seed, dt=args.dt,
+                             steps=args.steps or 20000, workers=args.workers)
+        print(f"{grid.exponent.size} parameter sets in {time.perf_counter() - start:.2f} s")
+        if not grid.axes:
+            print(f"Largest Lyapunov exponent: {grid.exponent:.4f} ± {grid.spread:.4f}")
+            return
+        fig = plot_lyapunov_grid(grid)
+
+    if args.output:
+        fig.savefig(args.output, dpi=150)
+    else:
+        plt.show()
+
+if __name__ == "__main__":
+    main()
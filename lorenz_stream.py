@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+from scipy.integrate import odeint
+from lorenz import lorenz_system
+
+def progress_path(path):
+    return path + '.json'
+
+def load_progress(path):
+    """Progress record of a streamed run, or None if there is nothing to resume."""
+    meta_path = progress_path(path)
+    if not (os.path.exists(path) and os.path.exists(meta_path)):
+        return None
+    with open(meta_path) as f:
+        return json.load(f)
+
+def save_progress(path, progress):
+    # Write then rename so an interrupted run never leaves a truncated record
+    meta_path = progress_path(path)
+    with open(meta_path + '.tmp', 'w') as f:
+        json.dump(progress, f, indent=2)
+    os.replace(meta_path + '.tmp', meta_path)
+
+def integrate_to_file(path, samples, dt=0.01, chunk_size=100000, sigma=10, rho=28, beta=8/3,
+                      initial_state=(1.0, 1.0, 1.0), dtype='float64', resume=True, verbose=True):
+    """Integrate the Lorenz system into a memory-mapped .npy file, one chunk at a time.
+
+    The output holds `samples` states spaced dt apart, starting from
+    initial_state. Only one chunk is in memory at a time; after each chunk
+    the file is flushed and the number of samples written and the last state
+    (at full precision, whatever dtype the file uses) are recorded in
+    `path`.json. With resume set, a run interrupted part way continues from
+    that record. Since odeint restarts at every chunk boundary, the chaotic
+    trajectory depends on chunk_size as well as dt, and a resume with a
+    different chunk_size is refused. Returns the samples written as a
+    read-only memmap.
+    """
+    parameters = {'dt': dt, 'chunk_size': chunk_size, 'sigma': sigma, 'rho': rho, 'beta': beta,
+                  'initial_state': [float(v) for v in initial_state], 'dtype': np.dtype(dtype).name}
+    progress = load_progress(path) if resume else None
+    if progress is not None:
+        if progress['parameters'] != parameters:
+            raise ValueError(f"{path} was written with different parameters: {progress['parameters']}")
+        out = np.lib.format.open_memmap(path, mode='r+')
+        if len(out) != samples:
+            raise ValueError(f"{path} holds {len(out)} samples, not {samples}")
+        done = progress['samples_done']
+        state = np.array(progress['last_state'])
+        if verbose and done < samples:
+            print(f"Resuming {path} at sample {done} of {samples}")
+    else:
+        # Drop any record of an earlier run before its file is overwritten
+        if os.path.exists(progress_path(path)):
+            os.remove(progress_path(path))
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(samples, 3))
+        state = np.array(initial_state, dtype=float)
+        out[0] = state
+        done = 1
+        out.flush()
+        save_progress(path, {'parameters': parameters, 'samples': samples,
+                             'samples_done': done, 'last_state': state.tolist()})
+
+    start_done = done
+    start = time.perf_counter()
+    while done < samples:
+        n = min(chunk_size, samples - done)
+        chunk_start = time.perf_counter()
+        # Autonomous system, so each chunk can restart the clock at zero
+        solution = odeint(lorenz_system, state, np.arange(n + 1) * dt, args=(sigma, rho, beta))
+        out[done:done + n] = solution[1:]
+        state = solution[-1]
+        done += n
+
+        out.flush()
+        save_progress(path, {'parameters': parameters, 'samples': samples,
+                             'samples_done': done, 'last_state': state.tolist()})
+        if verbose:
+            rate = n / (time.perf_counter() - chunk_start)
+            print(f"{done}/{samples} samples ({100 * done / samples:.1f}%), {rate:,.0f} steps/s")
+
+    elapsed = time.perf_counter() - start
+    if verbose and done > start_done:
+        print(f"Integrated {done - start_done} steps in {elapsed:.1f} s, "
+              f"{(done - start_done) / elapsed:,.0f} steps/s overall")
+    del out
+    return load_series(path)
+
+def load_series(path):
+    """Completed samples of a streamed run as a read-only memmap."""
+    series = np.load(path, mmap_mode='r')
+    progress = load_progress(path)
+    return series[:progress['samples_done']] if progress else series
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a long Lorenz time series to a .npy file.")
+    parser.add_argument('output', help="output .npy file")
+    parser.add_argument('-n', '--samples', type=float, default=1e6, help="number of samples, e.g. 1e8")
+    parser.add_argument('--dt', type=float, default=0.01, help="time step between samples")
+    parser.add_argument('--chunk', type=int, default=100000, help="samples per integration chunk")
+    parser.add_argument('--sigma', type=float, default=10.0)
+    parser.add_argument('--rho', type=float, default=28.0)
+    parser.add_argument('--beta', type=float, default=8/3)
+    parser.add_argument('--float32', action='store_true', help="store samples as float32 to halve the file size")
+    parser.add_argument('--restart', action='store_true', help="overwrite an existing run instead of resuming it")
+    args = parser.parse_args()
+
+    integrate_to_file(args.output, int(args.samples), args.dt, args.chunk, args.sigma, args.rho, args.beta,
+                      dtype='float32' if args.float32 else 'float64', resume=not args.restart)
+
+if __name__ == "__main__":
+    main()
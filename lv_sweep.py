@@ -0,0 +1,172 @@
+import argparse
+import time
+from collections import namedtuple
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.integrate import odeint
+from sweep_utils import map_batches, parameter_grid, parse_axis
+
+# Parameter order of a sweep, with the phaseflow GUI defaults for axes that are not swept
+PARAMETERS = ('alpha', 'beta', 'delta', 'gamma', 'x0', 'y0')
+DEFAULTS = {'alpha': 1.0, 'beta': 0.1, 'delta': 0.075, 'gamma': 1.5, 'x0': 10.0, 'y0': 5.0}
+LABELS = {'alpha': 'Prey growth rate (α)', 'beta': 'Predation rate (β)',
+          'delta': 'Predator growth rate (δ)', 'gamma': 'Predator death rate (γ)',
+          'x0': 'Initial prey population', 'y0': 'Initial predator population'}
+
+SweepResult = namedtuple('SweepResult', ['axes', 'period', 'prey_amplitude', 'predator_amplitude', 'extinct'])
+
+def lotka_volterra_batch(X, t, alpha, beta, delta, gamma):
+    """Lotka-Volterra right-hand side for many runs stacked as [x0, y0, x1, y1, ...]."""
+    x = X[0::2]
+    y = X[1::2]
+    dXdt = np.empty_like(X)
+    dXdt[0::2] = alpha * x - beta * x * y
+    dXdt[1::2] = delta * x * y - gamma * y
+    return dXdt
+
+def solve_batch(alpha, beta, delta, gamma, x0, y0, t):
+    """Solve a batch of runs in a single odeint call; returns shape (len(t), runs, 2).
+
+    Interleaving prey and predator keeps the Jacobian tridiagonal, so the
+    banded form (ml=mu=1) lets LSODA handle thousands of runs without a
+    dense Jacobian if it switches to its stiff method.
+    """
+    X0 = np.column_stack([x0, y0]).ravel()
+    solution = odeint(lotka_volterra_batch, X0, t, args=(alpha, beta, delta, gamma), ml=1, mu=1)
+    return solution.reshape(len(t), -1, 2)
+
+def oscillation_period(t, values):
+    """Mean time between upward crossings of each run's time average, NaN without two crossings."""
+    s = values - values.mean(axis=0)
+    upward = (s[:-1] < 0) & (s[1:] >= 0)
+    # Interpolated crossing time of every upward step
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crossing = t[:-1, None] + (t[1] - t[0]) * -s[:-1] / (s[1:] - s[:-1])
+    count = upward.sum(axis=0)
+    first = np.argmax(upward, axis=0)
+    last = len(upward) - 1 - np.argmax(upward[::-1], axis=0)
+    runs = np.arange(values.shape[1])
+    with np.errstate(invalid='ignore'):
+        period = (crossing[last, runs] - crossing[first, runs]) / (count - 1)
+    return np.where(count >= 2, period, np.nan)
+
+def batch_metrics(alpha, beta, delta, gamma, x0, y0, t_max, points, extinction_threshold):
+    """Solve one batch and reduce it to (period, prey amplitude, predator amplitude, extinct)."""
+    t = np.linspace(0, t_max, points)
+    solution = solve_batch(alpha, beta, delta, gamma, x0, y0, t)
+    prey = solution[..., 0]
+
+    # Amplitudes from the second half, past any transient
+    tail = solution[points // 2:]
+    amplitude = 0.5 * (tail.max(axis=0) - tail.min(axis=0))
+    extinct = (solution.min(axis=(0, 2)) < extinction_threshold) | ~np.all(np.isfinite(solution), axis=(0, 2))
+    period = oscillation_period(t, prey)
+    period[extinct] = np.nan
+    return period, amplitude[:, 0], amplitude[:, 1], extinct
+
+def sweep(t_max=100.0, points=1000, batch_size=1024, workers=None, extinction_threshold=1e-3, **axes):
+    """Integrate every combination of the given parameter values and summarise each run.
+
+    Runs are solved batch_size at a time as one stacked ODE system, and
+    batches are spread over a process pool when workers > 1. Returns a
+    SweepResult whose metric arrays have one dimension per swept axis, in
+    PARAMETERS order: the prey oscillation period (NaN when extinct or not
+    oscillating), the prey and predator amplitudes, and whether either
+    population fell below extinction_threshold.
+    """
+    flat, swept = parameter_grid(PARAMETERS, DEFAULTS, **axes)
+    runs = len(flat['alpha'])
+    batches = [tuple(flat[name][start:start + batch_size] for name in PARAMETERS)
+               for start in range(0, runs, batch_size)]
+    results = map_batches(batch_metrics, batches, (t_max, points, extinction_threshold), workers)
+
+    shape = tuple(len(values) for values in swept.values())
+    metrics = [np.concatenate(parts).reshape(shape) for parts in zip(*results)]
+    return SweepResult(swept, *metrics)
+
+def plot_sweep(result, x=None, y=None):
+    """Heatmaps of the sweep metrics over two swept axes.
+
+    x and y default to the first two swept axes; any further swept axes are
+    fixed at their first value.
+    """
+    names = list(result.axes)
+    if len(names) < 2:
+        raise ValueError("Heatmaps need a sweep over at least two parameters")
+    x = x or names[0]
+    y = y or next(name for name in names if name != x)
+
+    # Index the metric arrays at the first value of every other swept axis
+    index = tuple(slice(None) if name in (x, y) else 0 for name in names)
+    transpose = names.index(x) > names.index(y)
+
+    fig, axes = plt.subplots(2, 2, figsize=(12, 9))
+    panels = [('Prey oscillation period', result.period, 'viridis', None),
+              ('Prey amplitude', result.prey_amplitude, 'viridis', None),
+              ('Predator amplitude', result.predator_amplitude, 'viridis', None),
+              ('Extinction', result.extinct.astype(float), 'Reds', (0, 1))]
+    for ax, (title, values, cmap, limits) in zip(axes.flat, panels):
+        values = values[index]
+        values = values if transpose else values.T  # Rows along y for pcolormesh
+        mesh = ax.pcolormesh(result.axes[x], result.axes[y], values, shading='auto', cmap=cmap,
+                             vmin=limits and limits[0], vmax=limits and limits[1])
+        fig.colorbar(mesh, ax=ax)
+        ax.set_xlabel(LABELS[x])
+        ax.set_ylabel(LABELS[y])
+        ax.set_title(title)
+    fig.suptitle('Lotka-Volterra Parameter Sweep')
+    fig.tight_layout(rect=[0, 0.03, 1, 0.95])
+    return fig
+
+def plot_bifurcation(parameter, values, t_max=100.0, points=1000, **fixed):
+    """Bifurcation diagram: prey maxima and minima over the second half of each run against one parameter."""
+    flat, _ = parameter_grid(PARAMETERS, DEFAULTS, **{parameter: values}, **fixed)
+    t = np.linspace(0, t_max, points)
+    solution = solve_batch(*(flat[name] for name in PARAMETERS), t)
+    prey = solution[points // 2:, :, 0]
+
+    # Local extrema of each run
+    interior = prey[1:-1]
+    peaks = ((interior > prey[:-2]) & (interior >= prey[2:])) | ((interior < prey[:-2]) & (interior <= prey[2:]))
+    step, run = np.nonzero(peaks)
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(flat[parameter][run], interior[step, run], 'k.', markersize=2)
+    ax.set_xlabel(LABELS[parameter])
+    ax.set_ylabel('Prey population extrema')
+    ax.set_title('Lotka-Volterra Bifurcation Diagram')
+    return fig
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep the Lotka-Volterra model over a grid of parameters.")
+    for name in PARAMETERS:
+        parser.add_argument(f'--{name}', type=parse_axis, default=None,
+                            help=f"{LABELS[name]}: value, list a,b,c or range start:stop:count (default {DEFAULTS[name]})")
+    parser.add_argument('--t-max', type=float, default=100.0, help="simulation time")
+    parser.add_argument('--points', type=int, default=1000, help="time samples per run")
+    parser.add_argument('--bifurcation', choices=PARAMETERS, help="draw a bifurcation diagram over this parameter")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="number of worker processes")
+    parser.add_argument('-o', '--output', help="save the figure instead of showing it")
+    args = parser.parse_args()
+
+    axes = {name: getattr(args, name) for name in PARAMETERS if getattr(args, name) is not None}
+    if args.bifurcation:
+        values = axes.pop(args.bifurcation, np.linspace(0.5 * DEFAULTS[args.bifurcation], 2 * DEFAULTS[args.bifurcation], 200))
+        fig = plot_bifurcation(args.bifurcation, values, args.t_max, args.points, **axes)
+    else:
+        if not axes:
+            axes = {'alpha': np.linspace(0.5, 2.0, 60), 'beta': np.linspace(0.05, 0.2, 60)}
+        start = time.perf_counter()
+        result = sweep(args.t_max, args.points, workers=args.workers, **axes)
+        runs = result.period.size
+        print(f"Simulated {runs} runs in {time.perf_counter() - start:.2f} s, "
+              f"{int(result.extinct.sum())} with an extinction")
+        fig = plot_sweep(result)
+
+    if args.output:
+        fig.savefig(args.output, dpi=150)
+    else:
+        plt.show()
+
+if __name__ == "__main__":
+    main()
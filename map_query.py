@@ -0,0 +1,120 @@
+#!/usr/bin/python3
+
+import os
+import re
+import glob
+import argparse
+import numpy as np
+import pandas as pd
+from surface_model import load_surface
+
+def map_name(path):
+    """'dataset-KB30.txt' -> 'KB30'; the plain 'dataset.txt' keeps its stem."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r'^dataset-', '', stem)
+
+class MapStore:
+    """All dP(VFR, RPM) pump maps of a directory, loaded once and queried by name.
+
+    Maps are held in a list and addressed by integer index through a name
+    lookup, so a batch of queries is grouped per map and each map's
+    interpolator is called once per batch however many points it receives.
+    """
+
+    def __init__(self, directory='.', pattern='dataset*.txt'):
+        paths = sorted(glob.glob(os.path.join(directory, pattern)))
+        self.names = [map_name(path) for path in paths]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.surfaces = [load_surface(path) for path in paths]
+
+    def query(self, maps, vfr, rpm, use_grid=False):
+        """Return dP for arrays of (map name, VFR, RPM); NaN outside a map or for unknown maps."""
+        maps = np.asarray(maps)
+        vfr = np.broadcast_to(np.asarray(vfr, dtype=float), maps.shape)
+        rpm = np.broadcast_to(np.asarray(rpm, dtype=float), maps.shape)
+        result = np.full(maps.shape, np.nan)
+
+        # Resolve names once per distinct map, then evaluate each map's points together
+        names, inverse = np.unique(maps, return_inverse=True)
+        inverse = inverse.reshape(maps.shape)
+        for code, name in enumerate(names):
+            if name not in self.index:
+                print(f"Unknown map '{name}'")
+                continue
+            surface = self.surfaces[self.index[name]]
+            selected = inverse == code
+            method = surface.lookup if use_grid else surface.query
+            result[selected] = method(vfr[selected], rpm[selected])
+        return result
+
+    def solve_rpm(self, maps, vfr, dP, which='first'):
+        """Return the RPM reaching each target dP at each VFR, grouped per map like query()."""
+        maps = np.asarray(maps)
+        vfr = np.broadcast_to(np.asarray(vfr, dtype=float), maps.shape)
+        dP = np.broadcast_to(np.asarray(dP, dtype=float), maps.shape)
+        result = np.full(maps.shape, np.nan)
+
+        names, inverse = np.unique(maps, return_inverse=True)
+        inverse = inverse.reshape(maps.shape)
+        for code, name in enumerate(names):
+            if name not in self.index:
+                print(f"Unknown map '{name}'")
+                continue
+            selected = inverse == code
+            result[selected] = self.surfaces[self.index[name]].solve_rpm(vfr[selected], dP[selected], which)
+        return result
+
+    def query_table(self, table, map_column='map', vfr_column='VFR', rpm_column='RPM', use_grid=False):
+        """Add a dP column to a table of operating points."""
+        table = table.copy()
+        table['dP'] = self.query(table[map_column].astype(str).to_numpy(), table[vfr_column].to_numpy(),
+                                 table[rpm_column].to_numpy(), use_grid)
+        return table
+
+    def solve_table(self, table, map_column='map', vfr_column='VFR', dp_column='dP', which='first'):
+        """Add an RPM column to a table of (map, VFR, dP) setpoints."""
+        table = table.copy()
+        table['RPM'] = self.solve_rpm(table[map_column].astype(str).to_numpy(), table[vfr_column].to_numpy(),
+                                      table[dp_column].to_numpy(), which)
+        return table
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up dP on the pump maps for one or many operating points.")
+    parser.add_argument('points', nargs='?', help="CSV of operating points with map, VFR and RPM columns "
+                                                  "(map, VFR and dP columns with --inverse)")
+    parser.add_argument('-o', '--output', help="output CSV (default: print the result)")
+    parser.add_argument('--map', help="map name for a single query, e.g. KB30")
+    parser.add_argument('--vfr', type=float, help="VFR (cm^3/s) for a single query")
+    parser.add_argument('--rpm', type=float, help="RPM for a single query")
+    parser.add_argument('--dp', type=float, help="target dP for a single inverse query")
+    parser.add_argument('--inverse', action='store_true', help="solve RPM for target dP instead of looking up dP")
+    parser.add_argument('--last', action='store_true', help="take the highest RPM solution instead of the lowest")
+    parser.add_argument('--directory', default='.', help="folder containing the dataset-*.txt maps")
+    parser.add_argument('--grid', action='store_true', help="use the precomputed grid instead of exact interpolation")
+    args = parser.parse_args()
+
+    store = MapStore(args.directory)
+    print(f"Loaded maps: {', '.join(store.names)}")
+
+    which = 'last' if args.last else 'first'
+    if args.points:
+        if args.inverse:
+            result = store.solve_table(pd.read_csv(args.points), which=which)
+        else:
+            result = store.query_table(pd.read_csv(args.points), use_grid=args.grid)
+        if args.output:
+            result.to_csv(args.output, index=False)
+            print(f"{len(result)} operating points written to {args.output}")
+        else:
+            print(result)
+    elif args.inverse and args.map is not None and args.vfr is not None and args.dp is not None:
+        rpm = store.solve_rpm([args.map], [args.vfr], [args.dp], which)[0]
+        print(f"RPM at {args.map} (VFR={args.vfr}, dP={args.dp}): {rpm:.4f}")
+    elif args.map is not None and args.vfr is not None and args.rpm is not None:
+        dP = store.query([args.map], [args.vfr], [args.rpm], use_grid=args.grid)[0]
+        print(f"dP at {args.map} (VFR={args.vfr}, RPM={args.rpm}): {dP:.4f}")
+    else:
+        parser.error("give a CSV of operating points, or --map, --vfr and --rpm (--dp with --inverse)")
+
+if __name__ == "__main__":
+    main()
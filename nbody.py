@@ -0,0 +1,197 @@
+import numpy as np
+from orbit_integrators import G
+
+def pairwise_acceleration(positions, masses, softening=0.0, G=G, chunk_size=2048):
+    """Softened gravitational acceleration of every body from all others, O(N^2).
+
+    Computed by broadcasting (chunk, N, 3) separation arrays, in chunks of
+    target bodies so memory stays bounded for a few thousand bodies.
+    """
+    accelerations = np.empty_like(positions)
+    eps2 = softening**2
+    for start in range(0, len(positions), chunk_size):
+        stop = min(start + chunk_size, len(positions))
+        d = positions[None, :, :] - positions[start:stop, None, :]
+        r2 = np.einsum('ijk,ijk->ij', d, d) + eps2
+        with np.errstate(divide='ignore'):
+            inv_r3 = r2**-1.5
+        # A body exerts no force on itself
+        inv_r3[np.arange(stop - start), np.arange(start, stop)] = 0.0
+        accelerations[start:stop] = G * np.einsum('ij,ijk->ik', inv_r3 * masses[None, :], d)
+    return accelerations
+
+class OctreeNode:
+    __slots__ = ('mass', 'center_of_mass', 'center', 'size', 'children', 'body')
+
+def build_octree(positions, masses, indices=None, center=None, half=None):
+    """Barnes-Hut octree; leaves hold a single body index."""
+    if indices is None:
+        indices = np.arange(len(positions))
+        low, high = positions.min(axis=0), positions.max(axis=0)
+        center = 0.5 * (low + high)
+        half = 0.5 * np.max(high - low) * 1.0001 + 1e-12
+
+    node = OctreeNode()
+    node.mass = masses[indices].sum()
+    node.center_of_mass = masses[indices] @ positions[indices] / node.mass if node.mass > 0 else center
+    node.center = center
+    node.size = 2 * half
+    node.children = []
+    node.body = indices[0] if len(indices) == 1 else -1
+
+    if len(indices) > 1:
+        if half < 1e-9 * max(1.0, np.max(np.abs(center))):
+            # Coincident bodies: stop splitting and treat them as one aggregate
+            node.body = -2
+            return node
+        octant = ((positions[indices] > center) * np.array([1, 2, 4])).sum(axis=1)
+        for code in range(8):
+            selected = indices[octant == code]
+            if len(selected):
+                offset = (np.array([code & 1, (code >> 1) & 1, (code >> 2) & 1]) - 0.5) * half
+                node.children.append(build_octree(positions, masses, selected, center + offset, half / 2))
+    return node
+
+def barnes_hut_acceleration(positions, masses, softening=0.0, theta=0.5, G=G):
+    """Approximate accelerations with a Barnes-Hut octree, O(N log N).
+
+    The tree is walked once per node for all bodies together: at each node
+    the bodies for which the node is far enough (size / distance < theta)
+    take its monopole contribution, and the rest descend to its children.
+    """
+    accelerations = np.zeros_like(positions)
+    eps2 = softening**2
+    stack = [(build_octree(positions, masses), np.arange(len(positions)))]
+    while stack:
+        node, bodies = stack.pop()
+        d = node.center_of_mass - positions[bodies]
+        r2 = np.einsum('ij,ij->i', d, d)
+        if node.body >= 0:
+            far = bodies != node.body
+        elif node.body == -2:
+            far = r2 > 0
+        else:
+            # Never use the monopole of a cell that contains the body itself
+            inside = np.all(np.abs(positions[bodies] - node.center) <= 0.5 * node.size, axis=1)
+            far = (node.size**2 < theta**2 * r2) & ~inside
+        if np.any(far):
+            inv_r3 = (r2[far] + eps2)**-1.5
+            accelerations[bodies[far]] += G * node.mass * inv_r3[:, None] * d[far]
+        near = bodies[~far]
+        if len(near) and node.children:
+            for child in node.children:
+                stack.append((child, near))
+    return accelerations
+
+# Above this many bodies method='auto' switches to Barnes-Hut
+BARNES_HUT_THRESHOLD = 2000
+
+def nbody_acceleration(positions, masses, softening=0.0, method='auto', theta=0.5):
+    if method == 'barnes_hut' or (method == 'auto' and len(positions) > BARNES_HUT_THRESHOLD):
+        return barnes_hut_acceleration(positions, masses, softening, theta)
+    return pairwise_acceleration(positions, masses, softening)
+
+def to_barycentric(positions, velocities, masses):
+    """Shift positions and velocities so the center of mass is at rest at the origin."""
+    total = masses.sum()
+    return (positions - masses @ positions / total,
+            velocities - masses @ velocities / total)
+
+def total_energy(positions, velocities, masses, softening=0.0, G=G):
+    """Kinetic plus softened potential energy of the system."""
+    kinetic = 0.5 * np.sum(masses * np.einsum('ij,ij->i', velocities, velocities))
+    i, j = np.triu_indices(len(masses), k=1)
+    d = positions[i] - positions[j]
+    potential = -G * np.sum(masses[i] * masses[j] / np.sqrt(np.einsum('ij,ij->i', d, d) + softening**2))
+    return kinetic + potential
+
+def total_momentum(velocities, masses):
+    return masses @ velocities
+
+def simulate_nbody(positions, velocities, masses, dt, steps, softening=0.0, method='auto',
+                   theta=0.5, save_every=1, barycentric=True, callback=None, callback_every=1000):
+    """Leapfrog integration of an N-body system.
+
+    Returns the saved positions with shape (saved frames, N, 3) and a dict of
+    diagnostics: relative energy drift and momentum drift (relative to the
+    total momentum scale) at each saved frame. Energy diagnostics use the
+    O(N^2) sum, so they are only computed for up to BARNES_HUT_THRESHOLD bodies.
+    If given, callback is called every callback_every steps with the frames
+    saved so far; when it returns True the integration stops there and only
+    those frames are returned.
+    """
+    positions = np.array(positions, dtype=float)
+    velocities = np.array(velocities, dtype=float)
+    masses = np.asarray(masses, dtype=float)
+    if barycentric:
+        positions, velocities = to_barycentric(positions, velocities, masses)
+
+    frames = steps // save_every + 1
+    trajectory = np.empty((frames,) + positions.shape)
+    trajectory[0] = positions
+    track_energy = len(masses) <= BARNES_HUT_THRESHOLD
+    energy = np.full(frames, np.nan)
+    momentum = np.empty((frames, 3))
+    if track_energy:
+        energy[0] = total_energy(positions, velocities, masses, softening)
+    momentum[0] = total_momentum(velocities, masses)
+    momentum_scale = np.sum(masses * np.linalg.norm(velocities, axis=1)) or 1.0
+
+    saved = frames
+    a = nbody_acceleration(positions, masses, softening, method, theta)
+    for step in range(1, steps + 1):
+        velocities += 0.5 * dt * a
+        positions += dt * velocities
+        a = nbody_acceleration(positions, masses, softening, method, theta)
+        velocities += 0.5 * dt * a
+        if step % save_every == 0:
+            frame = step // save_every
+            trajectory[frame] = positions
+            momentum[frame] = total_momentum(velocities, masses)
+            if track_energy:
+                energy[frame] = total_energy(positions, velocities, masses, softening)
+        if callback is not None and step % callback_every == 0 and step < steps:
+            if callback(trajectory[:step // save_every + 1]):
+                saved = step // save_every + 1
+                break
+
+    trajectory, energy, momentum = trajectory[:saved], energy[:saved], momentum[:saved]
+    diagnostics = {
+        'energy_drift': np.abs(energy / energy[0] - 1),
+        'momentum_drift': np.linalg.norm(momentum - momentum[0], axis=1) / momentum_scale,
+    }
+    return trajectory, diagnostics
+
+def earth_moon_sun():
+    """Masses, positions and velocities of the Sun, Earth and Moon (Moon at 5.14 deg inclination)."""
+    masses = np.array([1.989e30, 5.97e24, 7.34e22])
+    inclination = np.radians(5.14)
+    positions = np.array([[0.0, 0.0, 0.0],
+                          [1.496e11, 0.0, 0.0],
+                          [1.496e11 + 3.844e8, 0.0, 0.0]])
+    velocities = np.array([[0.0, 0.0, 0.0],
+                           [0.0, 29780.0, 0.0],
+                           [0.0, 29780.0 + 1022.0 * np.cos(inclination), 1022.0 * np.sin(inclination)]])
+    return positions, velocities, masses
+
+def satellite_swarm(count, center_mass=5.97e24, radius_range=(7e6, 4.2e7), seed=None):
+    """A central body with `count` test-mass satellites on random circular orbits."""
+    rng = np.random.default_rng(seed)
+    radius = rng.uniform(*radius_range, count)
+    phase = rng.uniform(0, 2 * np.pi, count)
+    inclination = rng.uniform(0, np.pi / 3, count)
+    speed = np.sqrt(G * center_mass / radius)
+
+    # Circular orbit in the x-y plane, then tilted about the x axis
+    position = np.stack([radius * np.cos(phase), radius * np.sin(phase), np.zeros(count)], axis=1)
+    velocity = np.stack([-speed * np.sin(phase), speed * np.cos(phase), np.zeros(count)], axis=1)
+    cos_i, sin_i = np.cos(inclination), np.sin(inclination)
+    for vector in (position, velocity):
+        y, z = vector[:, 1].copy(), vector[:, 2].copy()
+        vector[:, 1] = cos_i * y - sin_i * z
+        vector[:, 2] = sin_i * y + cos_i * z
+
+    positions = np.vstack([np.zeros((1, 3)), position])
+    velocities = np.vstack([np.zeros((1, 3)), velocity])
+    masses = np.concatenate([[center_mass], np.full(count, 1000.0)])
+    return positions, velocities, masses
@@ -0,0 +1,84 @@
+import time
+import numpy as np
+
+class MarkerAnimation:
+    """Plays a marker along a trajectory on a Tk-embedded matplotlib axes.
+
+    The trajectory is decimated to fps * duration frames so long simulations
+    play in a fixed wall-clock time. Everything except the marker is drawn
+    once and cached as a background bitmap; each frame only restores that
+    bitmap, draws the marker and blits the axes area. The background is
+    recaptured on every full redraw, e.g. after the user rotates the view.
+    With rotate set, the view turns over the playback and each frame is a
+    full redraw instead of a blit.
+    """
+
+    def __init__(self, master, canvas, ax, marker, trajectory, fps=30, duration=20.0,
+                 speed=1.0, rotate=False):
+        self.master = master
+        self.canvas = canvas
+        self.ax = ax
+        self.marker = marker
+        self.trajectory = trajectory
+        self.fps = fps
+        self.speed = speed
+        self.rotate = rotate
+
+        # Evenly spaced frame indices covering the whole trajectory
+        frames = max(2, int(fps * duration))
+        self.indices = np.linspace(0, len(trajectory) - 1, min(frames, len(trajectory))).astype(int)
+        self.position = 0.0
+        self.after_id = None
+        self.background = None
+
+        self.marker.set_animated(True)
+        self.draw_id = self.canvas.mpl_connect('draw_event', self.on_draw)
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.draw_marker()
+
+    def draw_marker(self):
+        self.ax.draw_artist(self.marker)
+
+    def set_speed(self, speed):
+        self.speed = float(speed)
+
+    def start(self):
+        self.stop()
+        self.position = 0.0
+        self.canvas.draw()  # Full draw once; on_draw caches the background
+        self.last_time = time.perf_counter()
+        self.tick()
+
+    def stop(self):
+        if self.after_id is not None:
+            self.master.after_cancel(self.after_id)
+            self.after_id = None
+
+    def disconnect(self):
+        self.stop()
+        self.canvas.mpl_disconnect(self.draw_id)
+
+    def tick(self):
+        index = int(self.position)
+        if index >= len(self.indices):
+            self.after_id = None
+            return
+
+        point = self.trajectory[self.indices[index]]
+        self.marker.set_data_3d([point[0]], [point[1]], [point[2]])
+
+        if self.rotate:
+            self.ax.view_init(elev=20, azim=200 * index / len(self.indices))  # Rotate view
+            self.canvas.draw()
+        elif self.background is not None:
+            self.canvas.restore_region(self.background)
+            self.draw_marker()
+            self.canvas.blit(self.ax.bbox)
+
+        # Advance by elapsed wall-clock time so slow frames do not slow playback
+        now = time.perf_counter()
+        self.position += max(now - self.last_time, 1.0 / self.fps) * self.fps * self.speed
+        self.last_time = now
+        self.after_id = self.master.after(int(1000 / self.fps), self.tick)
@@ -0,0 +1,101 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+
+G = 6.67430e-11  # Gravitational constant
+
+def initial_conditions(distance, velocity, inclination_deg):
+    """Position and velocity arrays for orbits starting on the x axis.
+
+    All arguments may be arrays of the same shape to set up a batch of
+    orbits; the results then have that shape plus a trailing axis of 3.
+    """
+    distance, velocity, inclination = np.broadcast_arrays(
+        np.asarray(distance, dtype=float), np.asarray(velocity, dtype=float),
+        np.radians(np.asarray(inclination_deg, dtype=float)))
+    zeros = np.zeros_like(distance)
+    r = np.stack([distance, zeros, zeros], axis=-1)
+    v = np.stack([zeros, velocity * np.cos(inclination), velocity * np.sin(inclination)], axis=-1)
+    return r, v
+
+def acceleration(r, mu):
+    """Acceleration towards a fixed central mass for positions r of shape (..., 3)."""
+    r_mag = np.sqrt(np.einsum('...i,...i->...', r, r))
+    return -(mu / r_mag**3)[..., None] * r
+
+def leapfrog(r0, v0, mu, dt, steps):
+    """Integrate with the symplectic kick-drift-kick leapfrog (velocity Verlet) scheme.
+
+    r0 and v0 have shape (..., 3) and mu broadcasts against (...), so many
+    orbits advance together as array operations. Returns preallocated
+    position and velocity trajectories of shape (steps + 1, ..., 3).
+    """
+    r = np.array(r0, dtype=float)
+    v = np.array(v0, dtype=float)
+    mu = np.asarray(mu, dtype=float)
+
+    positions = np.empty((steps + 1,) + r.shape)
+    velocities = np.empty((steps + 1,) + v.shape)
+    positions[0] = r
+    velocities[0] = v
+
+    a = acceleration(r, mu)
+    for step in range(1, steps + 1):
+        v += 0.5 * dt * a
+        r += dt * v
+        a = acceleration(r, mu)
+        v += 0.5 * dt * a
+        positions[step] = r
+        velocities[step] = v
+    return positions, velocities
+
+def adaptive_rk(r0, v0, mu, dt, steps, method='DOP853', rtol=1e-9, atol=1e-3):
+    """Integrate with an adaptive Runge-Kutta scheme, sampled every dt.
+
+    The whole batch is flattened into one state vector for solve_ivp, so
+    step size control uses the least favourable orbit of the batch.
+    Returns trajectories of shape (steps + 1, ..., 3) like leapfrog().
+    """
+    r0 = np.asarray(r0, dtype=float)
+    v0 = np.asarray(v0, dtype=float)
+    shape = r0.shape
+    mu = np.broadcast_to(np.asarray(mu, dtype=float), shape[:-1])
+    size = r0.size
+
+    def rhs(t, state):
+        r = state[:size].reshape(shape)
+        v = state[size:]
+        return np.concatenate([v, acceleration(r, mu).ravel()])
+
+    t_eval = np.arange(steps + 1) * dt
+    solution = solve_ivp(rhs, (0, t_eval[-1]), np.concatenate([r0.ravel(), v0.ravel()]),
+                         method=method, t_eval=t_eval, rtol=rtol, atol=atol)
+    states = solution.y.T
+    positions = states[:, :size].reshape((len(states),) + shape)
+    velocities = states[:, size:].reshape((len(states),) + shape)
+    return positions, velocities
+
+def euler(r0, v0, mu, dt, steps):
+    """The original semi-implicit Euler scheme, kept for comparison."""
+    r = np.array(r0, dtype=float)
+    v = np.array(v0, dtype=float)
+    positions = np.empty((steps + 1,) + r.shape)
+    velocities = np.empty((steps + 1,) + v.shape)
+    positions[0] = r
+    velocities[0] = v
+    for step in range(1, steps + 1):
+        v += acceleration(r, mu) * dt
+        r += v * dt
+        positions[step] = r
+        velocities[step] = v
+    return positions, velocities
+
+INTEGRATORS = {
+    'Leapfrog': leapfrog,
+    'Adaptive RK (DOP853)': adaptive_rk,
+    'Euler': euler,
+}
+
+def specific_energy(positions, velocities, mu):
+    """Specific orbital energy v^2/2 - mu/r, for checking energy drift."""
+    r_mag = np.sqrt(np.einsum('...i,...i->...', positions, positions))
+    return 0.5 * np.einsum('...i,...i->...', velocities, velocities) - mu / r_mag
@@ -4,6 +4,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from scipy.integrate import odeint
+from sim_worker import SimulationWorker
 
 def lotka_volterra(X, t, alpha, beta, delta, gamma):
     x, y = X
@@ -17,6 +18,20 @@ def simulate_predator_prey(alpha, beta, delta, gamma, x0, y0, t_max):
     solution = odeint(lotka_volterra, X0, t, args=(alpha, beta, delta, gamma))
     return t, solution
 
+def simulate_predator_prey_streaming(progress, alpha, beta, delta, gamma, x0, y0, t_max, chunks=10):
+    """simulate_predator_prey in time chunks, reporting the solution so far after each one."""
+    t = np.linspace(0, t_max, 1000)
+    solution = np.empty((len(t), 2))
+    solution[0] = [x0, y0]
+    bounds = np.linspace(0, len(t) - 1, chunks + 1).astype(int)
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        if progress.cancelled:
+            return None
+        # Continue from the last state of the previous chunk
+        solution[start:stop + 1] = odeint(lotka_volterra, solution[start], t[start:stop + 1], args=(alpha, beta, delta, gamma))
+        progress.report((t[:stop + 1], solution[:stop + 1].copy()))
+    return t, solution
+
 class PredatorPreyGUI:
     def __init__(self, master):
         self.master = master
@@ -40,6 +55,9 @@ class PredatorPreyGUI:
         self.create_input_frame()
         self.create_plot_frame()
 
+        # Solver runs in the background; a new Simulate click cancels the running one
+        self.worker = SimulationWorker(master)
+
     def toggle_fullscreen(self, event=None):
         self.is_fullscreen = not self.is_fullscreen
         self.master.attributes("-fullscreen", self.is_fullscreen)
@@ -106,7 +124,14 @@ class PredatorPreyGUI:
         y0 = self.y0.get()
         t_max = self.t_max.get()
 
-        t, solution = simulate_predator_prey(alpha, beta, delta, gamma, x0, y0, t_max)
+        params = (alpha, beta, delta, gamma)
+        draw = lambda data: self.draw_solution(*data, params)
+        self.worker.submit(simulate_predator_prey_streaming, alpha, beta, delta, gamma, x0, y0, t_max,
+                           on_partial=draw, on_result=draw,
+                           on_error=lambda e: print(f"Simulation failed: {e}"))
+
+    def draw_solution(self, t, solution, params):
+        alpha, beta, delta, gamma = params
         prey, predator = solution.T
 
         for ax in self.ax.flat:
@@ -0,0 +1,98 @@
+import queue
+import threading
+
+class Progress:
+    """Handed to a running job to stream partial results and check for cancellation."""
+
+    def __init__(self, results, generation, cancel_event):
+        self.results = results
+        self.generation = generation
+        self.cancel_event = cancel_event
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def report(self, partial):
+        if not self.cancelled:
+            self.results.put((self.generation, 'partial', partial))
+
+class SimulationWorker:
+    """Runs simulations off the Tk main thread and delivers results through after().
+
+    submit() starts the job in a background thread and cancels the run it
+    supersedes. The job receives a Progress object as its first argument; it
+    can stream partial results with progress.report() and should return early
+    once progress.cancelled is set. Results are queued and picked up by a
+    poll on the Tk event loop, so the callbacks always run on the main
+    thread, and results of superseded runs are dropped.
+    """
+
+    def __init__(self, master, poll_ms=50):
+        self.master = master
+        self.poll_ms = poll_ms
+        self.results = queue.Queue()
+        self.generation = 0
+        self.cancel_event = threading.Event()
+        self.callbacks = {}
+        self.poll_id = None
+
+    def submit(self, job, *args, on_result=None, on_partial=None, on_error=None):
+        self.cancel()
+        self.generation += 1
+        self.cancel_event = threading.Event()
+        self.callbacks = {'result': on_result, 'partial': on_partial, 'error': on_error}
+        progress = Progress(self.results, self.generation, self.cancel_event)
+
+        def run():
+            try:
+                result = job(progress, *args)
+                if progress.cancelled:
+                    self.results.put((progress.generation, 'cancelled', None))
+                else:
+                    self.results.put((progress.generation, 'result', result))
+            except Exception as e:
+                self.results.put((progress.generation, 'error', e))
+
+        threading.Thread(target=run, daemon=True).start()
+        if self.poll_id is None:
+            self.poll_id = self.master.after(self.poll_ms, self.poll)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def busy(self):
+        return self.poll_id is not None
+
+    def poll(self):
+        finished = False
+        try:
+            while True:
+                try:
+                    generation, kind, payload = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                if generation != self.generation:
+                    continue  # Result of a superseded run
+                finished = finished or kind in ('result', 'error', 'cancelled')
+                self.deliver(kind, payload)
+        finally:
+            # Keep polling even if a callback failed, or later submits would never be picked up
+            if finished:
+                self.poll_id = None
+            else:
+                self.poll_id = self.master.after(self.poll_ms, self.poll)
+
+    def deliver(self, kind, payload):
+        """Run the callback for one result, passing anything it raises to on_error."""
+        callback = self.callbacks.get(kind)
+        if callback is None:
+            return
+        try:
+            callback(payload)
+        except Exception as e:
+            on_error = self.callbacks.get('error')
+            if on_error is None or kind == 'error':
+                raise
+            on_error(e)
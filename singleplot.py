@@ -1,9 +1,10 @@
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy import interpolate
+from surface_model import load_surface
 
-# load the file
-xyz = np.genfromtxt('dataset-KB30.txt')
+# load the surface model (triangulation and gradients are cached per dataset)
+surface = load_surface('dataset-KB30.txt')
+xyz = surface.xyz
 
 # Define the query point (VFRq,RPMq)
 VFRq = 30
@@ -22,16 +23,15 @@ RPMmax = dy * (round(np.max(xyz[:, 1]) / dy) + 1)
 dPmin = dz * (round(np.min(xyz[:, 2]) / dz) - 1)
 dPmax = dz * (round(np.max(xyz[:, 2]) / dz) + 1)
 
-# Create a 2D interpolator to calculate the z-value at any position
-interp = interpolate.CloughTocher2DInterpolator(xyz[:,:2], xyz[:,2])
-Zq = interp(VFRq, RPMq)
+# Interpolate the z-value at the query position
+Zq = surface.query(VFRq, RPMq)
 
 # Plot
 fig, ax = plt.subplots(figsize=[12, 8])  # Create a single subplot
 
 # Override the format_coord method to display x, y, and z values
 def fmt(x, y):
-    z = interp(x, y).item()
+    z = surface.lookup(x, y).item()  # precomputed grid, constant time per mouse move
     return f'x={x:.5f}  y={y:.5f}  z={z:.5f}'
 
 ax.format_coord = fmt
@@ -0,0 +1,159 @@
+import os
+import pickle
+import hashlib
+import numpy as np
+from scipy import interpolate
+from scipy.spatial import cKDTree
+
+# Pickled surface models, one file per dataset content hash
+CACHE_DIRECTORY = '.surface_cache'
+
+# Bumped whenever SurfaceModel gains state, so stale pickles are not reused
+CACHE_VERSION = 2
+
+class SurfaceModel:
+    """dP(VFR, RPM) surface of one pump map.
+
+    Wraps a Clough-Tocher interpolator, whose Delaunay triangulation and
+    gradient estimates are built once, together with a precomputed regular
+    grid of the surface for constant-time lookups such as hover readouts.
+    """
+
+    def __init__(self, xyz, grid_shape=(200, 200)):
+        self.xyz = xyz
+        self.interp = interpolate.CloughTocher2DInterpolator(xyz[:, :2], xyz[:, 2])
+        self.build_grid(grid_shape)
+
+        # KD-tree over the (VFR, RPM) plane, with both axes scaled to unit range
+        # so neighbour distances are not dominated by the larger coordinate
+        self.scale = np.ptp(xyz[:, :2], axis=0)
+        self.scale[self.scale == 0] = 1.0
+        self.tree = cKDTree(xyz[:, :2] / self.scale)
+
+    def build_grid(self, grid_shape):
+        self.grid_x = np.linspace(np.min(self.xyz[:, 0]), np.max(self.xyz[:, 0]), grid_shape[0])
+        self.grid_y = np.linspace(np.min(self.xyz[:, 1]), np.max(self.xyz[:, 1]), grid_shape[1])
+        X, Y = np.meshgrid(self.grid_x, self.grid_y, indexing='ij')
+        self.grid_z = self.interp(X, Y)
+
+    def query(self, vfr, rpm):
+        """Interpolate dP at arrays of (VFR, RPM) points in one call."""
+        return self.interp(np.asarray(vfr, dtype=float), np.asarray(rpm, dtype=float))
+
+    def nearest(self, vfr, rpm, k=1):
+        """Indices into xyz of the k nearest data points of each query point."""
+        points = np.column_stack([np.ravel(vfr), np.ravel(rpm)]).astype(float)
+        _, indices = self.tree.query(points / self.scale, k=k)
+        return indices
+
+    def enclosing_triangles(self, vfr, rpm):
+        """Vertex indices and barycentric weights of the triangle enclosing each point.
+
+        Uses the interpolator's Delaunay triangulation, whose point location
+        is vectorized. Points outside the convex hull get -1 indices and NaN
+        weights.
+        """
+        points = np.column_stack([np.ravel(vfr), np.ravel(rpm)]).astype(float)
+        tri = self.interp.tri
+        simplex = tri.find_simplex(points)
+        transform = tri.transform[simplex]
+        partial = np.einsum('nij,nj->ni', transform[:, :2], points - transform[:, 2])
+        weights = np.column_stack([partial, 1 - partial.sum(axis=1)])
+        vertices = tri.simplices[simplex]
+        outside = simplex < 0
+        vertices[outside] = -1
+        weights[outside] = np.nan
+        return vertices, weights
+
+    def linear_query(self, vfr, rpm):
+        """Piecewise-linear dP from the enclosing triangles of many points at once."""
+        vertices, weights = self.enclosing_triangles(vfr, rpm)
+        return np.sum(weights * self.xyz[vertices, 2], axis=1)
+
+    def solve_rpm(self, vfr, dP, which='first', tol=1e-6, max_iterations=60):
+        """Inverse query: the RPM giving a target dP at a given VFR, for many targets at once.
+
+        The exact interpolator is sampled at the grid RPM nodes along each
+        query VFR in one vectorized call. This profile is scanned for the node
+        intervals that bracket the target (the first or last along RPM, per
+        `which`), and the brackets are then refined by vectorized bisection on
+        the exact interpolator. NaN where no RPM in the map reaches the target.
+        """
+        vfr = np.ravel(np.asarray(vfr, dtype=float))
+        dP = np.broadcast_to(np.ravel(np.asarray(dP, dtype=float)), vfr.shape)
+
+        # Sampling the interpolator itself, rather than blending grid columns,
+        # keeps brackets near the hull edge where a grid column is NaN
+        profile = self.query(vfr[:, None], self.grid_y[None, :]) - dP[:, None]
+
+        # Node intervals whose end values straddle the target
+        brackets = profile[:, :-1] * profile[:, 1:] <= 0
+        found = brackets.any(axis=1)
+        if which == 'last':
+            j = brackets.shape[1] - 1 - np.argmax(brackets[:, ::-1], axis=1)
+        else:
+            j = np.argmax(brackets, axis=1)
+
+        rows = np.arange(len(vfr))
+        lo, hi = self.grid_y[j], self.grid_y[j + 1]
+        f_lo = profile[rows, j]
+        for _ in range(max_iterations):
+            mid = 0.5 * (lo + hi)
+            f_mid = self.query(vfr, mid) - dP
+            # Keep the half whose ends still bracket the root
+            left = np.sign(f_mid) == np.sign(f_lo)
+            lo = np.where(left, mid, lo)
+            f_lo = np.where(left, f_mid, f_lo)
+            hi = np.where(left, hi, mid)
+            if np.all(hi - lo < tol):
+                break
+        return np.where(found, 0.5 * (lo + hi), np.nan)
+
+    def lookup(self, vfr, rpm):
+        """Bilinear lookup in the precomputed grid; NaN outside the data."""
+        vfr = np.asarray(vfr, dtype=float)
+        rpm = np.asarray(rpm, dtype=float)
+        dx = self.grid_x[1] - self.grid_x[0]
+        dy = self.grid_y[1] - self.grid_y[0]
+
+        # Fractional grid coordinates, so no search is needed
+        u = (vfr - self.grid_x[0]) / dx
+        v = (rpm - self.grid_y[0]) / dy
+        inside = (u >= 0) & (u <= len(self.grid_x) - 1) & (v >= 0) & (v <= len(self.grid_y) - 1)
+        i = np.clip(np.floor(np.nan_to_num(u)).astype(int), 0, len(self.grid_x) - 2)
+        j = np.clip(np.floor(np.nan_to_num(v)).astype(int), 0, len(self.grid_y) - 2)
+        fu = u - i
+        fv = v - j
+
+        z = self.grid_z
+        result = ((1 - fu) * (1 - fv) * z[i, j] + fu * (1 - fv) * z[i + 1, j]
+                  + (1 - fu) * fv * z[i, j + 1] + fu * fv * z[i + 1, j + 1])
+        return np.where(inside, result, np.nan)
+
+def dataset_hash(path):
+    with open(path, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+def load_surface(path, cache_dir=CACHE_DIRECTORY, grid_shape=(200, 200)):
+    """Load the surface model of a dataset file, building and caching it on first use.
+
+    The cache file name contains the hash of the dataset content, the grid
+    shape and CACHE_VERSION, so editing the dataset automatically triggers a
+    rebuild.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    key = f"{dataset_hash(path)[:16]}-{grid_shape[0]}x{grid_shape[1]}-v{CACHE_VERSION}"
+    cache_path = os.path.join(cache_dir, f"{stem}-{key}.pkl")
+
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, AttributeError, EOFError) as e:
+            print(f"Rebuilding unreadable surface cache '{cache_path}': {e}")
+
+    surface = SurfaceModel(np.genfromtxt(path), grid_shape)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_path, 'wb') as file:
+        pickle.dump(surface, file)
+    return surface
@@ -0,0 +1,63 @@
+import numpy as np
+import plotly.graph_objects as go
+
+def decimate_points(xyz, x_range=None, y_range=None, bins=(150, 150)):
+    """Reduce a scattered (x, y, z) cloud to at most one point per bin of the view.
+
+    Points outside the view ranges are dropped, then the remaining ones are
+    binned on a regular (x, y) grid spanning the view and each occupied bin
+    is replaced by the mean of its points. The level of detail therefore
+    follows the view: zooming into a smaller range keeps more of the data.
+    Returns the reduced (n, 3) array and the number of points per bin.
+    """
+    xyz = np.asarray(xyz, dtype=float)
+    x_range = x_range or (np.min(xyz[:, 0]), np.max(xyz[:, 0]))
+    y_range = y_range or (np.min(xyz[:, 1]), np.max(xyz[:, 1]))
+    inside = ((xyz[:, 0] >= x_range[0]) & (xyz[:, 0] <= x_range[1])
+              & (xyz[:, 1] >= y_range[0]) & (xyz[:, 1] <= y_range[1]))
+    xyz = xyz[inside]
+    if len(xyz) <= bins[0] * bins[1]:
+        return xyz, np.ones(len(xyz), dtype=int)
+
+    # Flat bin index of every point, then per-bin sums with bincount
+    i = np.minimum(((xyz[:, 0] - x_range[0]) / (x_range[1] - x_range[0]) * bins[0]).astype(int), bins[0] - 1)
+    j = np.minimum(((xyz[:, 1] - y_range[0]) / (y_range[1] - y_range[0]) * bins[1]).astype(int), bins[1] - 1)
+    cell = i * bins[1] + j
+    counts = np.bincount(cell, minlength=bins[0] * bins[1])
+    occupied = counts > 0
+    sums = np.column_stack([np.bincount(cell, weights=xyz[:, k], minlength=bins[0] * bins[1]) for k in range(3)])
+    return sums[occupied] / counts[occupied, None], counts[occupied]
+
+def scatter_trace(xyz, size=5, opacity=0.8):
+    """Scatter3d trace with float32 arrays, which plotly serialises as compact binary."""
+    xyz = np.asarray(xyz, dtype=np.float32)
+    return go.Scatter3d(x=xyz[:, 0], y=xyz[:, 1], z=xyz[:, 2], mode='markers',
+                        marker=dict(size=size, color=xyz[:, 2], colorscale='Viridis', opacity=opacity))
+
+def surface_trace(surface, opacity=0.6):
+    """Surface mesh of a SurfaceModel, drawn from its precomputed regular grid."""
+    return go.Surface(x=surface.grid_x.astype(np.float32), y=surface.grid_y.astype(np.float32),
+                      z=surface.grid_z.T.astype(np.float32), colorscale='Viridis',
+                      opacity=opacity, showscale=False)
+
+def build_figure(xyz, x_range=None, y_range=None, z_range=None, bins=(150, 150), surface=None):
+    """Figure of the decimated points in the view, optionally with the fitted surface."""
+    points, _ = decimate_points(xyz, x_range, y_range, bins)
+    traces = [scatter_trace(points)]
+    if surface is not None:
+        traces.append(surface_trace(surface))
+
+    fig = go.Figure(data=traces)
+    fig.update_layout(
+        scene=dict(
+            xaxis_title='Q',
+            yaxis_title='RPM',
+            zaxis_title='dP',
+            xaxis_range=x_range,
+            yaxis_range=y_range,
+            zaxis_range=z_range,
+            camera=dict(eye=dict(x=1.5, y=1.5, z=1.5)),
+        ),
+        title=f'Interactive 3D Surface Plot ({len(points)} of {len(xyz)} points shown)',
+    )
+    return fig
@@ -0,0 +1,33 @@
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+def parameter_grid(parameters, defaults, **axes):
+    """Full grid of all parameter combinations, flattened, plus the swept axes.
+
+    parameters is the model's parameter order and defaults its values for
+    unspecified parameters. Each keyword is a parameter name with a value or
+    a sequence of values; parameters with a single value and unspecified
+    ones are fixed. Returns a dict of flat arrays and an ordered dict of
+    swept axes.
+    """
+    unknown = set(axes) - set(parameters)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+    values = {name: np.atleast_1d(np.asarray(axes.get(name, defaults[name]), dtype=float)) for name in parameters}
+    swept = {name: values[name] for name in parameters if len(values[name]) > 1}
+    grids = np.meshgrid(*values.values(), indexing='ij')
+    return {name: grid.ravel() for name, grid in zip(parameters, grids)}, swept
+
+def map_batches(function, batches, extra=(), workers=None):
+    """function(*batch, *extra) for every batch, over a process pool when workers > 1."""
+    if workers and workers > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(function, *zip(*batches), *([value] * len(batches) for value in extra)))
+    return [function(*batch, *extra) for batch in batches]
+
+def parse_axis(text):
+    """'start:stop:count' or a comma-separated list of values."""
+    if ':' in text:
+        start, stop, count = text.split(':')
+        return np.linspace(float(start), float(stop), int(count))
+    return [float(value) for value in text.split(',')]
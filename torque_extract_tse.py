@@ -1,41 +1,138 @@
 import os
+import re
 import csv
+import glob
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Location of the probe files inside each design point folder
+PROBE_SUBDIR = os.path.join('PFL', 'PFL', 'Outputs')
+PROBE_PATTERN = 'Torque_on_mvpt*.prb'
+
+
+def read_last_line(file_path, block_size=4096):
+    """Return the last non-empty line of a file by reading backwards from its end."""
+    with open(file_path, 'rb') as file:
+        file.seek(0, os.SEEK_END)
+        position = file.tell()
+        tail = b''
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            file.seek(position)
+            tail = file.read(read_size) + tail
+            lines = tail.rstrip().splitlines()
+            # Stop once a full line is available (or the start of the file is reached)
+            if len(lines) > 1 or (position == 0 and lines):
+                return lines[-1].decode()
+    return ''
+
 
 def get_last_value(file_path):
-    with open(file_path, 'r') as file:
-        lines = file.read().splitlines()
-        last_line = lines[-1]
-        last_value = last_line.split()[-1]  # Extract the last value
-        return last_value
-
-# Base path and folder names
-base_path = r'D:\00_ML2954\04_TSE_MODEL\KB30_files'
-folder_names = [f'dp{i}' for i in range(35)]
-
-# Initialize lists to store values
-values1 = []  # For Torque_on_mvpt1.prb
-values2 = []  # For Torque_on_mvpt2.prb
-
-# Iterate through folders
-for folder_name in folder_names:
-    file_path1 = os.path.join(base_path, folder_name, 'PFL', 'PFL', 'Outputs', 'Torque_on_mvpt1.prb')
-    file_path2 = os.path.join(base_path, folder_name, 'PFL', 'PFL', 'Outputs', 'Torque_on_mvpt2.prb')
-    
-    last_value1 = get_last_value(file_path1)
-    last_value2 = get_last_value(file_path2)
-    
-    values1.append(last_value1)
-    values2.append(last_value2)
-
-# Save values to CSV file
-output_file = 'torque_values_output.csv'
-with open(output_file, 'w', newline='') as csvfile:
-    writer = csv.writer(csvfile)
-    writer.writerow(['Folder', 'Torque_on_mvpt1', 'Torque_on_mvpt2'])
-    for folder_name, value1, value2 in zip(folder_names, values1, values2):
-        writer.writerow([folder_name, value1, value2])
-
-print(f"Values saved to {output_file}")
+    last_line = read_last_line(file_path)
+    return last_line.split()[-1]  # Extract the last value
+
+
+def design_point_number(folder):
+    match = re.search(r'(\d+)$', os.path.basename(folder))
+    return int(match.group(1)) if match else -1
+
+
+def discover_design_points(base_path):
+    """Return the dpN folders under base_path, sorted by design point number."""
+    folders = [path for path in glob.glob(os.path.join(base_path, 'dp*')) if os.path.isdir(path)]
+    return sorted(folders, key=design_point_number)
+
+
+def probe_number(name):
+    match = re.search(r'(\d+)$', os.path.splitext(name)[0])
+    return int(match.group(1)) if match else -1
+
+
+def discover_probe_names(folders):
+    """Return the probe file names found in any design point, sorted by probe number."""
+    names = set()
+    for folder in folders:
+        for path in glob.glob(os.path.join(folder, PROBE_SUBDIR, PROBE_PATTERN)):
+            names.add(os.path.basename(path))
+    return sorted(names, key=lambda name: (probe_number(name), name))
+
+
+def extract_probe(file_path):
+    """Read the final value of one probe file, returning (value, elapsed seconds)."""
+    start = time.perf_counter()
+    try:
+        value = get_last_value(file_path)
+    except (OSError, IndexError) as e:
+        print(f"Error reading file {file_path}: {e}")
+        value = ''
+    return value, time.perf_counter() - start
+
+
+def extract_all(base_path, max_workers=16):
+    """Read the last value of every probe in every design point using a thread pool.
+
+    Returns the folder names, probe names, a {folder: {probe: value}} mapping and
+    a list of (file path, elapsed seconds) timings.
+    """
+    folders = discover_design_points(base_path)
+    probe_names = discover_probe_names(folders)
+    paths = [(folder, name, os.path.join(folder, PROBE_SUBDIR, name))
+             for folder in folders for name in probe_names]
+
+    # The work is I/O bound, so threads overlap the network latency of each read
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(extract_probe, [path for _, _, path in paths]))
+
+    values = {os.path.basename(folder): {} for folder in folders}
+    timings = []
+    for (folder, name, path), (value, elapsed) in zip(paths, results):
+        values[os.path.basename(folder)][os.path.splitext(name)[0]] = value
+        timings.append((path, elapsed))
+
+    folder_names = [os.path.basename(folder) for folder in folders]
+    probes = [os.path.splitext(name)[0] for name in probe_names]
+    return folder_names, probes, values, timings
+
+
+def write_csv(output_file, folder_names, probes, values):
+    with open(output_file, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Folder'] + probes)
+        for folder_name in folder_names:
+            writer.writerow([folder_name] + [values[folder_name].get(probe, '') for probe in probes])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract the final torque value of every TSE probe file.")
+    parser.add_argument('base_path', nargs='?', default=r'D:\00_ML2954\04_TSE_MODEL\KB30_files',
+                        help="folder containing the dpN design point folders")
+    parser.add_argument('-o', '--output', default='torque_values_output.csv', help="output CSV file")
+    parser.add_argument('-j', '--workers', type=int, default=16, help="number of reader threads")
+    parser.add_argument('-v', '--verbose', action='store_true', help="print the timing of every file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    folder_names, probes, values, timings = extract_all(args.base_path, args.workers)
+    total = time.perf_counter() - start
+
+    if not folder_names:
+        print(f"No design point folders found in '{args.base_path}'.")
+        return
+
+    write_csv(args.output, folder_names, probes, values)
+
+    if args.verbose:
+        for path, elapsed in timings:
+            print(f"{elapsed * 1000:8.2f} ms  {path}")
+    if timings:
+        slowest = max(timings, key=lambda item: item[1])
+        print(f"Read {len(timings)} files from {len(folder_names)} folders in {total:.3f} s "
+              f"(slowest {slowest[1] * 1000:.2f} ms: {slowest[0]})")
 
+    print(f"Values saved to {args.output}")
 
 
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,89 @@
 import re
+from collections import namedtuple
 
-# Initialize a dictionary to store the z-component of torque for each part
-torque_z = {}
+# One force/torque report for a moving part at a given evolution step
+TorqueRecord = namedtuple('TorqueRecord', ['step', 'part', 'force', 'torque'])
 
-# Open the file for reading
-with open('polyflow.lst', 'r') as file:
-    # Read the entire file content
-    content = file.read()
+# Patterns for the lines the parser reacts to; everything else is skipped
+STEP_PATTERN = re.compile(r'Starting Step\s+(\d+)')
+PART_PATTERN = re.compile(r'moving part #(\d+)')
+VECTOR_PATTERN = re.compile(r'^\s*(force|torque)\s*=\s*\(([^)]*)\)')
 
-    # Define a regular expression pattern to match the torque line
-    pattern = r'torque\s*=\s*\(\s*(-?\d+\.\d+E[+-]?\d+)\s*,\s*(-?\d+\.\d+E[+-]?\d+)\s*,\s*(-?\d+\.\d+E[+-]?\d+)\)'
 
-    # Find all matches in the file content
-    matches = re.findall(pattern, content)
+def parse_vector(text):
+    """Convert the '( x , y , z)' contents of a listing line into a float tuple."""
+    return tuple(float(component) for component in text.split(','))
 
-    # Iterate over the matches
-    for match in matches:
-        # Extract the part number from the line before the match
-        part_number = re.search(r'moving part #(\d+)', content[:content.find(match[0])]).group(1)
 
-        # Convert the z-component from scientific notation to float
-        z_component = float(match[2])
+def iter_torque_records(file_path):
+    """Stream (step, part, force xyz, torque xyz) records from a Polyflow listing.
 
-        # Store the z-component in the dictionary
-        if part_number in torque_z:
-            torque_z[part_number].append(z_component)
-        else:
-            torque_z[part_number] = [z_component]
+    The file is read line by line and the current step and moving part are
+    tracked as state, so the whole listing is scanned once in constant memory.
+    A record is yielded as soon as the torque line of a part has been read.
+    """
+    step = 0
+    part = None
+    force = None
 
-# Sort the dictionary by part number
-torque_z = dict(sorted(torque_z.items()))
+    with open(file_path, 'r') as file:
+        for line in file:
+            # Cheap substring checks first; the regexes only run on candidate lines
+            if 'Starting Step' in line:
+                match = STEP_PATTERN.search(line)
+                if match:
+                    step = int(match.group(1))
+                    part = None
+                continue
 
-last_12_values = torque_z['1'][-12:]
+            if 'moving part #' in line:
+                match = PART_PATTERN.search(line)
+                if match:
+                    part = int(match.group(1))
+                    force = None
+                continue
 
-output_filename = "torque_values.txt"
+            if part is None or '=' not in line:
+                continue
 
-# Print the formatted output
-with open(output_filename, "w") as file:
-    for i, value in enumerate(last_12_values, start=1):
-        file.write(f"Torque#{i} {value:.6f}\n")
-        print(f"Torque#{i} {value:.6f}")
+            match = VECTOR_PATTERN.match(line)
+            if not match:
+                continue
 
-print(f"Torque values written to {output_filename}")
+            if match.group(1) == 'force':
+                force = parse_vector(match.group(2))
+            else:
+                yield TorqueRecord(step, part, force, parse_vector(match.group(2)))
+                # A part block ends with its torque line
+                part = None
+                force = None
+
+
+def last_step_torque_z(file_path):
+    """Return {part: torque z} for the last step reported in the listing."""
+    last_step = None
+    torque_z = {}
+    for record in iter_torque_records(file_path):
+        if record.step != last_step:
+            last_step = record.step
+            torque_z = {}
+        torque_z[record.part] = record.torque[2]
+    return dict(sorted(torque_z.items()))
+
+
+def main():
+    torque_z = last_step_torque_z('polyflow.lst')
+
+    output_filename = "torque_values.txt"
+
+    # Print the formatted output
+    with open(output_filename, "w") as file:
+        for part, value in torque_z.items():
+            file.write(f"Torque#{part} {value:.6f}\n")
+            print(f"Torque#{part} {value:.6f}")
+
+    print(f"Torque values written to {output_filename}")
+
+
+if __name__ == "__main__":
+    main()